@@ -0,0 +1,641 @@
+# benchmarks.py
+"""Micro-benchmarks for graphics.py
+
+Run all benchmarks with
+
+    python benchmarks.py
+
+or only some of them by naming them on the command line, e.g.
+
+    python benchmarks.py undraw
+"""
+
+import os, subprocess, sys, time
+
+from graphics import *
+
+
+def bench_undraw(sizes=(100, 1000, 5000, 20000), samples=200):
+    """Average cost of undrawing one object as the number of items
+    in the window grows. With the id-keyed item registry this should
+    stay flat instead of growing with the scene size."""
+    win = GraphWin("undraw", 200, 200, autoflush=False)
+    print("undraw: items  usec/undraw")
+    for n in sizes:
+        scene = [Line(Point(0, i % 200), Point(199, i % 200)).draw(win)
+                 for i in range(n)]
+        victims = scene[::max(1, n // samples)][:samples]
+        start = time.perf_counter()
+        for obj in victims:
+            obj.undraw()
+        elapsed = time.perf_counter() - start
+        print("        {:6d}  {:8.2f}".format(n, elapsed / len(victims) * 1e6))
+        for obj in scene:
+            obj.undraw()
+    win.close()
+
+
+def bench_import(runs=15):
+    """Wall time of a fresh interpreter importing graphics, compared
+    with one that imports nothing. Import no longer creates a Tk root,
+    so the difference is just compiling/loading the module, and it
+    works without a display. Where a display is available the cost of
+    creating the root, which import used to pay, is shown as well."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    def median(code):
+        times = []
+        for i in range(runs):
+            start = time.perf_counter()
+            subprocess.check_call([sys.executable, "-c", code], cwd=here)
+            times.append(time.perf_counter() - start)
+        return sorted(times)[runs // 2]
+    base = median("pass")
+    imp = median("import graphics")
+    print("import: interpreter {:.1f} ms, import graphics +{:.1f} ms".format(
+        base * 1e3, (imp - base) * 1e3))
+    try:
+        start = time.perf_counter()
+        root = tk.Tk()
+        root.withdraw()
+        root.update()
+        elapsed = time.perf_counter() - start
+        root.destroy()
+        print("        Tk root creation (now deferred) {:.1f} ms".format(
+            elapsed * 1e3))
+    except tk.TclError:
+        print("        no display available; Tk root creation skipped")
+
+
+def bench_input(clicks=100):
+    """Latency from a synthetic click being queued with event_generate
+    to getMouse returning it, and the CPU time used by a second of
+    idle waiting in getMouse."""
+    win = GraphWin("input", 200, 200)
+    latencies = []
+    for i in range(clicks):
+        sent = []
+        def click():
+            sent.append(time.perf_counter())
+            win.event_generate("<Button-1>", x=10, y=10, when="tail")
+        win.after(5, click)
+        win.getMouse()
+        latencies.append(time.perf_counter() - sent[0])
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1e3
+    print("input: click-to-return p50 {:.2f} ms, p90 {:.2f} ms, "
+          "p99 {:.2f} ms, max {:.2f} ms".format(pct(.5), pct(.9), pct(.99),
+                                                 latencies[-1] * 1e3))
+    start = time.process_time()
+    win.getMouse(timeout=1)
+    print("       CPU used by 1 s idle getMouse: {:.1f} ms".format(
+        (time.process_time() - start) * 1e3))
+    win.close()
+
+
+def bench_fade(runs=20):
+    """An EndBG.show-style fade: 60 lines, each with its own color,
+    faded in over 16 steps. Compares formatting every color with
+    max()/"%02x" on every step against indexing precomputed
+    fade_ramp tuples, first for the colors alone and then including
+    the setOutline calls (sleeps left out)."""
+    def colors_before():
+        for i in range(255, -17, -17):
+            for j in range(60):
+                "#%02x%02x%02x" % (max(0, 0 - i + j * 4),
+                                   max(0, - 100 - i + j * 4),
+                                   max(0, 100 - i - j * 4))
+    def colors_after():
+        ramps = [fade_ramp([j * 4, j * 4 - 100, 100 - j * 4], 17)
+                 for j in range(60)]
+        for i in range(len(ramps[0])):
+            for j in range(60):
+                ramps[j][i]
+    win = GraphWin("fade", 640, 480)
+    lines = []
+    for i in range(60):
+        line = Line(Point(0, 8 * i), Point(640, 8 * i - 60))
+        line.setWidth(8)
+        lines.append(line.draw(win))
+    def fade_before():
+        for i in range(255, -17, -17):
+            with win.frame():
+                for j in range(60):
+                    lines[j].setOutline("#%02x%02x%02x" % (
+                        max(0, 0 - i + j * 4), max(0, - 100 - i + j * 4),
+                        max(0, 100 - i - j * 4)))
+    def fade_after():
+        ramps = [fade_ramp([j * 4, j * 4 - 100, 100 - j * 4], 17)
+                 for j in range(60)]
+        for i in range(len(ramps[0])):
+            with win.frame():
+                for j in range(60):
+                    lines[j].setOutline(ramps[j][i])
+    def best(func):
+        times = []
+        for i in range(runs):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1e3
+    print("fade: colors only  before {:.3f} ms, after {:.3f} ms".format(
+        best(colors_before), best(colors_after)))
+    print("      with drawing before {:.3f} ms, after {:.3f} ms".format(
+        best(fade_before), best(fade_after)))
+    win.close()
+
+
+_SCENE_MEMORY = """
+import tracemalloc, graphics
+graphics.use_backend("null")
+tracemalloc.start()
+import rpg3
+snapshot = tracemalloc.take_snapshot()
+snapshot = snapshot.filter_traces([tracemalloc.Filter(True, graphics.__file__)])
+stats = snapshot.statistics("filename")
+print(sum(s.size for s in stats), sum(s.count for s in stats))
+"""
+
+def bench_memory():
+    """Memory held by graphics objects after rpg3 has built its
+    startup scene (importing rpg3 creates every scene object), measured
+    with tracemalloc in a fresh interpreter on the null backend. Only
+    allocations made by graphics.py code are counted."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.check_output([sys.executable, "-c", _SCENE_MEMORY],
+                                  cwd=here)
+    size, count = map(int, out.split())
+    print("memory: rpg3 startup scene {:.1f} KiB in {} blocks".format(
+        size / 1024, count))
+
+
+_FONT_COUNTS = """
+import random, graphics
+graphics.use_backend("record")
+random.seed(1)
+for i in range(3000):
+    graphics.feedMouse(100 + i % 4 * 150, 400 + i % 3 * 25)
+import rpg3
+try:
+    rpg3.main()
+except graphics.GraphicsError:
+    pass # out of scripted clicks
+sent = sum(1 for op in rpg3.win.ops
+           if op[0] == "create" and "font" in op[4]
+           or op[0] == "itemconfig" and "font" in op[2])
+print(sent, graphics.fontStats()["created"])
+"""
+
+def bench_fonts():
+    """Font resolutions during a scripted rpg3 session (clicks only,
+    fixed random seed, record backend, so boss fights included). Each
+    font change used to hand Tk a (face, size, style) description to
+    resolve; now Texts point at shared named fonts, which are only
+    resolved when they are created."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.check_output([sys.executable, "-c", _FONT_COUNTS],
+                                  cwd=here)
+    sent, created = map(int, out.split())
+    print("fonts: rpg3 session {} font descriptions resolved before, "
+          "{} named fonts created now".format(sent, created))
+
+
+_MENU_ITEMS = """
+import random, graphics
+graphics.use_backend("record")
+random.seed(1)
+for i in range(3000):
+    graphics.feedMouse(100 + i % 4 * 150, 400 + i % 3 * 25)
+import rpg3
+start = len(rpg3.win.ops)
+try:
+    rpg3.main()
+except graphics.GraphicsError:
+    pass # out of scripted clicks
+ops = [op[0] for op in rpg3.win.ops[start:]]
+print(ops.count("create"), ops.count("delete"))
+"""
+
+def bench_menus(menus=200):
+    """Showing and taking down a four option rpg3-style menu (a Text
+    and a Polygon per option), drawing and undrawing the objects versus
+    drawing them through an ItemPool, which reuses hidden items. Also
+    counts the items rpg3 creates and deletes after its start-up scene,
+    during a scripted session on the record backend. Headless windows
+    create an item as cheaply as they change one, so there the pool
+    only shows its own overhead; what it saves is Tk's work of
+    creating and deleting items."""
+    win = GraphWin("menus", 640, 480)
+    def menu(draw, undraw):
+        for n in range(menus):
+            objs = []
+            for i in range(4):
+                x = 170 + i * 100
+                objs.append(draw(Text(Point(x, 440), "OPTION")))
+                objs.append(draw(Polygon(Point(x - 40, 420), Point(x + 40, 420),
+                                         Point(x + 45, 440), Point(x + 40, 460),
+                                         Point(x - 40, 460), Point(x - 45, 440))))
+            with win.frame():
+                for obj in objs:
+                    undraw(obj)
+    pool = ItemPool(win)
+    times = []
+    for draw, undraw in ((lambda obj: obj.draw(win), lambda obj: obj.undraw()),
+                         (pool.draw, pool.undraw)):
+        start = time.perf_counter()
+        menu(draw, undraw)
+        times.append(time.perf_counter() - start)
+    print("menus: {} menus, draw/undraw {:.1f} ms, ItemPool {:.1f} ms "
+          "({} items created)".format(menus, times[0] * 1e3, times[1] * 1e3,
+                                      pool.created))
+    win.close()
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.check_output([sys.executable, "-c", _MENU_ITEMS],
+                                  cwd=here)
+    created, deleted = map(int, out.split())
+    print("       rpg3 session: {} items created, {} deleted".format(
+        created, deleted))
+
+
+def bench_wrap(runs=100):
+    """Wrapping rpg3's manual pages to the 600 pixel message box with
+    Text.wrap: the first time, when every word is measured in the
+    font, and afterwards, when each page comes from the cache."""
+    import rpg3
+    with open(rpg3.__file__, encoding="utf-8") as f:
+        pages = [line.split('text.set("', 1)[1].rsplit('")', 1)[0]
+                 for line in f if 'text.set("' in line]
+    text = rpg3.text.obj
+    start = time.perf_counter()
+    for page in pages:
+        text.wrap(page, 600)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(runs):
+        for page in pages:
+            text.wrap(page, 600)
+    again = (time.perf_counter() - start) / runs
+    print("wrap: {} messages, first {:.3f} ms, cached {:.3f} ms".format(
+        len(pages), first * 1e3, again * 1e3))
+
+
+def bench_pixels(width=640, height=480):
+    """Filling a width x height Image with a gradient pixel by pixel
+    with setPixel versus all at once with put_region (and from_array
+    when NumPy is available), then reading it back with getPixel
+    versus get_region."""
+    img = Image(Point(width // 2, height // 2), width, height)
+    rows = [[color_rgb(x * 255 // width, y * 255 // height, 128)
+             for x in range(width)] for y in range(height)]
+    start = time.perf_counter()
+    for y in range(height):
+        row = rows[y]
+        for x in range(width):
+            img.setPixel(x, y, row[x])
+    per_pixel = time.perf_counter() - start
+    start = time.perf_counter()
+    img.put_region(0, 0, rows)
+    bulk = time.perf_counter() - start
+    print("pixels: fill {}x{} setPixel {:.3f} s, put_region {:.3f} s".format(
+        width, height, per_pixel, bulk))
+    if numpy is not None:
+        array = numpy.zeros((height, width, 3), numpy.uint8)
+        array[..., 0] = numpy.arange(width) * 255 // width
+        array[..., 1] = (numpy.arange(height) * 255 // height)[:, None]
+        array[..., 2] = 128
+        start = time.perf_counter()
+        img.from_array(array)
+        print("        from_array {:.3f} s".format(time.perf_counter() - start))
+    start = time.perf_counter()
+    for y in range(height):
+        for x in range(width):
+            img.getPixel(x, y)
+    per_pixel = time.perf_counter() - start
+    start = time.perf_counter()
+    img.get_region(0, 0, width, height)
+    bulk = time.perf_counter() - start
+    print("        read getPixel {:.3f} s, get_region {:.3f} s".format(
+        per_pixel, bulk))
+
+
+_RASTER_LOBBY = """
+import time, graphics
+graphics.use_backend("raster")
+graphics.feedMouse(220, 440) # START
+import rpg3
+try:
+    rpg3.main()
+except graphics.GraphicsError:
+    pass # waiting for a door to be chosen
+times = []
+for i in range(%d):
+    start = time.perf_counter()
+    frame = rpg3.win.snapshot()
+    times.append(time.perf_counter() - start)
+rpg3.opt.box[0].setOutline("red")
+other = rpg3.win.snapshot()
+start = time.perf_counter()
+frame.diff(other)
+diff = time.perf_counter() - start
+print(len(rpg3.win.scene), times[0], min(times), sorted(times)[len(times) // 2],
+      diff)
+"""
+
+def bench_raster(runs=20):
+    """Rendering rpg3's lobby (the doors, the status and message boxes
+    and the options under the floor grid) into a Frame with
+    GraphWin.snapshot on the raster backend, in a fresh interpreter,
+    and comparing it with Frame.diff to one with an option box
+    highlighted. The first snapshot finds the pixels of every line
+    and text; the others reuse them."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    out = subprocess.check_output([sys.executable, "-c",
+                                   _RASTER_LOBBY % runs], cwd=here)
+    items, first, best, median, diff = out.split()
+    print("raster: rpg3 lobby, {} items, snapshot first {:.2f} ms, "
+          "best {:.2f} ms, median {:.2f} ms, diff {:.2f} ms".format(
+              int(items), float(first) * 1e3, float(best) * 1e3,
+              float(median) * 1e3, float(diff) * 1e3))
+
+
+def bench_queue(workers=4, bars=50, updates=20000):
+    """A live dashboard fed by worker threads: each posts updates
+    to the colors and positions of its bars through a CommandQueue
+    while the main thread drains it once a frame, 60 times a second.
+    Shows how many of the posted commands were merged away and how
+    many were left to run per frame."""
+    import threading
+    win = GraphWin("queue", 640, 480)
+    rects = [Rectangle(Point(i * 12, 400), Point(i * 12 + 10, 480)).draw(win)
+             for i in range(workers * bars)]
+    queue = CommandQueue(win)
+    def work(n):
+        mine = rects[n * bars:(n + 1) * bars]
+        for i in range(updates):
+            rect = mine[i % bars]
+            queue.post(rect, "setFill", color_rgb(i % 256, 0, 255 - i % 256))
+            queue.post(rect, "move", 0, -1 if i % 2 else 1)
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(workers)]
+    frames = 0
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(1 / 60)
+        queue.drain()
+        frames = frames + 1
+    queue.drain()
+    elapsed = time.perf_counter() - start
+    print("queue: {} threads posted {} commands in {:.2f} s ({:.0f}/s), "
+          "{} frames".format(workers, queue.posted, elapsed,
+                             queue.posted / elapsed, frames))
+    print("       {} merged, {} run ({:.1f} per frame)".format(
+        queue.coalesced, queue.executed, queue.executed / max(frames, 1)))
+    win.close()
+
+
+def bench_async(counts=(1, 4, 16), steps=30):
+    """Wall time of n circles each fading in over steps frames at 60
+    frames per second, one after another with FrameClock.steps versus
+    all at once as asyncio tasks with FrameClock.stepsAsync, sharing
+    the one thread under graphics.run."""
+    import asyncio
+    win = GraphWin("async", 640, 480)
+    ramp = list(reversed(fade_ramp([255, 255, 255], steps)))
+    print("async: circles  one by one s  as tasks s")
+    for n in counts:
+        circles = [Circle(Point(20 + i * 36, 240), 15).draw(win)
+                   for i in range(n)]
+        start = time.perf_counter()
+        for circle in circles:
+            for color in FrameClock(60).steps(ramp):
+                circle.setFill(color)
+        serial = time.perf_counter() - start
+        async def fade(circle):
+            async for color in FrameClock(60).stepsAsync(ramp):
+                circle.setFill(color)
+        async def fade_all():
+            await asyncio.gather(*[fade(circle) for circle in circles])
+        start = time.perf_counter()
+        run(fade_all())
+        concurrent = time.perf_counter() - start
+        print("       {:7d}  {:13.3f}  {:10.3f}".format(n, serial, concurrent))
+        for circle in circles:
+            circle.undraw()
+    win.close()
+
+
+def bench_images(sprites=500, size=64):
+    """Making sprites Images from one size x size PPM file, decoding
+    the file for each one (as Image did before the image cache) versus
+    through the cache, and cloning one sprite that many times, which
+    no longer copies its pixels."""
+    import tempfile, graphics
+    data = bytes(range(256)) * (size * size * 3 // 256 + 1)
+    with tempfile.NamedTemporaryFile(suffix=".ppm", delete=False) as f:
+        f.write(b"P6\n%d %d\n255\n" % (size, size) + data[:size * size * 3])
+    try:
+        start = time.perf_counter()
+        for i in range(sprites):
+            graphics._photoImage(file=f.name)
+        decoded = time.perf_counter() - start
+        before = imageStats()
+        start = time.perf_counter()
+        images = [Image(Point(0, 0), f.name) for i in range(sprites)]
+        cached = time.perf_counter() - start
+        start = time.perf_counter()
+        clones = [images[0].clone() for i in range(sprites)]
+        cloned = time.perf_counter() - start
+        after = imageStats()
+    finally:
+        os.remove(f.name)
+    print("images: {} sprites, decode each {:.1f} ms, cached {:.1f} ms "
+          "({} hits, {} misses)".format(
+              sprites, decoded * 1e3, cached * 1e3,
+              after["hits"] - before["hits"],
+              after["misses"] - before["misses"]))
+    print("        clone {:.1f} ms, {} photos for {} images".format(
+        cloned * 1e3, len(set(id(img.img) for img in images + clones)),
+        2 * sprites))
+
+
+def bench_regions(counts=(4, 100, 1200), clicks=10000):
+    """Resolving clicks to the button under them among n buttons laid
+    out in a grid, checking every button in turn versus looking the
+    click up with regionAt, which only tests the buttons indexed under
+    the click's grid cell."""
+    import random
+    win = GraphWin("regions", 640, 480)
+    rng = random.Random(1)
+    points = [(rng.uniform(0, 640), rng.uniform(0, 480)) for i in range(clicks)]
+    print("regions: buttons  scan us/click  regionAt us/click")
+    for n in counts:
+        columns = int((n * 4 / 3.0) ** 0.5 + 0.5)
+        rows = (n + columns - 1) // columns
+        w, h = 640.0 / columns, 480.0 / rows
+        regions = [win.addRegion(Rectangle(Point(i % columns * w, i // columns * h),
+                                            Point((i % columns + 1) * w,
+                                                  (i // columns + 1) * h)),
+                                  value=i)
+                   for i in range(n)]
+        start = time.perf_counter()
+        for x, y in points:
+            for region in reversed(regions):
+                if region.contains(x, y):
+                    break
+        scan = time.perf_counter() - start
+        win.regionAt(0, 0) # build the index
+        start = time.perf_counter()
+        for x, y in points:
+            win.regionAt(x, y)
+        indexed = time.perf_counter() - start
+        print("         {:7d}  {:13.2f}  {:18.2f}".format(
+            n, scan / clicks * 1e6, indexed / clicks * 1e6))
+        for region in regions:
+            win.removeRegion(region)
+    win.close()
+
+
+def bench_clock(steps=51, rate=60, work=(0, 0.005, 0.02)):
+    """Wall time of a steps-long fade at rate steps per second when
+    every frame takes work seconds to draw, paced with sleep(1/rate)
+    after each step versus with FrameClock.steps, which keeps to the
+    nominal steps/rate seconds by dropping steps when behind."""
+    print("clock: nominal {:.3f} s".format(steps / float(rate)))
+    for w in work:
+        start = time.perf_counter()
+        for i in range(steps):
+            time.sleep(w)
+            sleep(1 / rate)
+        slept = time.perf_counter() - start
+        clock = FrameClock(rate)
+        start = time.perf_counter()
+        for i in clock.steps(range(steps)):
+            time.sleep(w)
+        paced = time.perf_counter() - start
+        print("       frame {:4.1f} ms: sleep {:.3f} s, FrameClock {:.3f} s "
+              "({} steps dropped)".format(w * 1e3, slept, paced,
+                                          clock.dropped))
+
+
+def bench_group(counts=(46, 200, 1000), runs=50):
+    """A Backdrop-style recolor of n lines, each frame setting every
+    line's outline one object at a time versus once through a Group,
+    which sends a single itemconfig on the group's canvas tag."""
+    win = GraphWin("group", 640, 480)
+    print("group: lines  per-object ms  Group ms")
+    for n in counts:
+        lines = [Line(Point(0, i % 480), Point(639, i % 480)) for i in range(n)]
+        group = Group(*lines).draw(win)
+        colors = fade_ramp([255, 255, 255], 5)
+        def each():
+            for color in colors:
+                with win.frame():
+                    for line in lines:
+                        line.setOutline(color)
+        def grouped():
+            for color in colors:
+                group.setOutline(color)
+        times = []
+        for func in (each, grouped):
+            start = time.perf_counter()
+            for i in range(runs):
+                func()
+            times.append((time.perf_counter() - start) / runs / len(colors))
+        print("       {:5d}  {:13.3f}  {:8.3f}".format(n, times[0] * 1e3,
+                                                       times[1] * 1e3))
+        group.undraw()
+    win.close()
+
+
+def bench_layers(counts=(5, 46, 200), runs=100):
+    """Hiding and showing n rectangles by moving each one off the
+    window and back, as rpg3's boxes used to, versus hiding and
+    showing the Layer holding them."""
+    win = GraphWin("layers", 640, 480)
+    print("layers: items  moves ms  Layer ms")
+    for n in counts:
+        boxes = [Rectangle(Point(i % 600, i % 440), Point(i % 600 + 40,
+                                                           i % 440 + 40))
+                 for i in range(n)]
+        layer = win.layer("boxes{}".format(n))
+        for box in boxes:
+            layer.add(box)
+        def moved():
+            for dy in (-480, 480):
+                for box in boxes:
+                    box.move(0, dy)
+        def toggled():
+            layer.hide()
+            layer.show()
+        times = []
+        for func in (moved, toggled):
+            start = time.perf_counter()
+            for i in range(runs):
+                func()
+            times.append((time.perf_counter() - start) / runs)
+        print("        {:5d}  {:8.3f}  {:8.3f}".format(n, times[0] * 1e3,
+                                                      times[1] * 1e3))
+        layer.undraw()
+    win.close()
+
+
+def bench_batch(counts=(46, 200, 1000), runs=20):
+    """Frames that recolor and move n rectangles one object at a time,
+    with the window's canvas changes sent to Tcl one call each versus
+    collected into a single script per frame (GraphWin.batching)."""
+    win = GraphWin("batch", 640, 480)
+    print("batch: items  unbatched calls/s  batched calls/s")
+    for n in counts:
+        boxes = [Rectangle(Point(i % 600, i % 440), Point(i % 600 + 40,
+                                                           i % 440 + 40))
+                 for i in range(n)]
+        for box in boxes:
+            box.draw(win)
+        colors = fade_ramp([255, 255, 255], 5)
+        rates = []
+        for batching in (False, True):
+            win.batching = batching
+            start = time.perf_counter()
+            for i in range(runs):
+                for color in colors:
+                    with win.frame():
+                        for box in boxes:
+                            box.setFill(color)
+                            box.move(1 - 2 * (i % 2), 0)
+            calls = runs * len(colors) * n * 2
+            rates.append(calls / (time.perf_counter() - start))
+        print("       {:5d}  {:17.0f}  {:15.0f}".format(n, *rates))
+        for box in boxes:
+            box.undraw()
+    win.batching = True
+    win.close()
+
+
+BENCHMARKS = {
+    "undraw": bench_undraw,
+    "import": bench_import,
+    "input": bench_input,
+    "regions": bench_regions,
+    "fade": bench_fade,
+    "memory": bench_memory,
+    "fonts": bench_fonts,
+    "wrap": bench_wrap,
+    "menus": bench_menus,
+    "pixels": bench_pixels,
+    "images": bench_images,
+    "raster": bench_raster,
+    "clock": bench_clock,
+    "async": bench_async,
+    "group": bench_group,
+    "batch": bench_batch,
+    "layers": bench_layers,
+    "queue": bench_queue,
+}
+
+def main(names):
+    for name in names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
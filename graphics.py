@@ -160,12 +160,22 @@ __version__ = "5.0beta"
 #     Added ability to set text atttributes.
 #     Added Entry boxes.
 
-import time, os, sys
+import time, os, sys, math, threading, asyncio, traceback
+from collections import deque, namedtuple, OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
 
 try:  # import as appropriate for 2.x vs. 3.x
    import tkinter as tk
+   import tkinter.font as tkFont
 except:
    import Tkinter as tk
+   import tkFont
+
+try:  # NumPy is optional; only the to_array and from_array methods need it
+   import numpy
+except ImportError:
+   numpy = None
 
 
 ##########################################################################
@@ -182,8 +192,62 @@ BAD_OPTION = "Illegal option value"
 ##########################################################################
 # global variables and funtions
 
-_root = tk.Tk()
-_root.withdraw()
+# The backend decides what new windows and images draw with:
+#   "tk"     -- a real Tk window (the default)
+#   "null"   -- no Tk at all; canvas items are kept in memory
+#   "record" -- like "null", but every canvas operation is also logged
+#   "raster" -- like "null", but windows can render themselves into an
+#               RGB image (see GraphWin.snapshot)
+# The GRAPHICS_BACKEND environment variable selects the initial backend.
+BACKENDS = ("tk", "null", "record", "raster")
+
+_backend = os.environ.get("GRAPHICS_BACKEND", "tk")
+if _backend not in BACKENDS:
+    raise GraphicsError(BAD_OPTION)
+
+# The Tk root shared by all windows. Importing the module does no Tk
+# work; the root is created by _tkRoot when the first window, image or
+# entry needs it.
+_root = None
+
+def _tkRoot():
+    global _root
+    if _root is None:
+        _root = tk.Tk()
+        _root.withdraw()
+        _root.update() # MacOS fix 1
+    return _root
+
+def use_backend(name):
+    """Select the backend ("tk", "null", "record" or "raster") used by windows,
+    images and entries created from now on."""
+    global _backend
+    if name not in BACKENDS:
+        raise GraphicsError(BAD_OPTION)
+    _backend = name
+
+def sleep(seconds):
+    """Pause for the given number of seconds. Headless backends
+    return at once so that scripted runs go at full speed."""
+    if _backend == "tk":
+        time.sleep(seconds)
+
+async def sleepAsync(seconds):
+    """sleep for coroutines: only the awaiting task pauses, while the
+    other tasks of the event loop (see run) go on running"""
+    await asyncio.sleep(seconds if _backend == "tk" else 0)
+
+# Input for headless windows. getMouse and getKey on a "null" or
+# "record" window consume these in order instead of waiting for a user.
+_scriptedInput = deque()
+
+def feedMouse(x, y):
+    """Queue a scripted click at window pixel (x,y) for headless windows"""
+    _scriptedInput.append(("mouse", x, y))
+
+def feedKey(key):
+    """Queue a scripted key press (a Tk keysym) for headless windows"""
+    _scriptedInput.append(("key", key))
 
 _update_lasttime = time.time()
 
@@ -193,34 +257,197 @@ def update(rate=None):
         now = time.time()
         pauseLength = 1/rate-(now-_update_lasttime)
         if pauseLength > 0:
-            time.sleep(pauseLength)
+            if _backend == "tk":
+                time.sleep(pauseLength)
             _update_lasttime = now + pauseLength
         else:
             _update_lasttime = now
 
-    _root.update()
+    if _root is not None:
+        _root.update()
+
+# Seconds between the passes of the Tk event loop made by tkPump
+TK_PUMP_INTERVAL = 0.005
+
+async def tkPump(interval=TK_PUMP_INTERVAL):
+    """Process Tk events every interval seconds until cancelled, so
+    that windows stay live and the async methods (GraphWin.mouse and
+    key, awaiting a Tween, FrameClock.tickAsync) see their events
+    while an asyncio event loop runs. run starts one for you.
+
+    This polls: input is seen up to interval seconds late, and the
+    loop wakes 1/interval times a second even when nothing happens.
+    At the default 5 ms that is 200 passes a second, each an update()
+    of some 10 microseconds when no events are waiting, about 3-4%
+    of one core in all, most of it the asyncio wakeups. Pass a larger
+    interval to trade latency for less CPU.
+
+    Waiting on the display connection with loop.add_reader instead
+    would not be enough: Tkinter does not give the connection's file
+    descriptor to Python, it doesn't exist on Windows or macOS, and
+    redraws and after() callbacks are Tk idle and timer events that
+    never make it readable."""
+    while True:
+        if _root is not None:
+            _root.update()
+        await asyncio.sleep(interval)
+
+def run(coroutine):
+    """Run coroutine to completion in a new asyncio event loop that
+    also runs Tk (see tkPump), and return its result. Tasks started
+    by coroutine can then draw, animate and wait for input side by
+    side on the one thread:
+
+        async def main():
+            win = GraphWin()
+            spin = asyncio.ensure_future(spinner(win))
+            p = await win.mouse()
+            spin.cancel()
+
+        graphics.run(main())
+    """
+    async def main():
+        pump = asyncio.ensure_future(tkPump())
+        try:
+            return await coroutine
+        finally:
+            pump.cancel()
+    return asyncio.run(main())
+
+class FrameClock:
+
+    """Paces an animation loop at rate steps per second.
+
+    Like update(rate), tick waits out the rest of the current step, but
+    the steps are counted from when the clock was started rather than
+    from the previous call, so the time spent drawing each frame does
+    not add up into a slower animation. When a frame overran its step,
+    tick returns at once with the number of steps that have passed, so
+    the caller can skip the ones it missed. steps does this for the
+    usual loop over the states of an animation:
+
+        for color in FrameClock(60).steps(fade_ramp([255, 255, 255])):
+            text.setFill(color)
+
+    frameTime is the measured duration of the last frame (from the end
+    of one tick to the start of the next) and dropped the number of
+    steps skipped since the clock was started."""
+
+    def __init__(self, rate=60):
+        self.rate = rate
+        self.frameTime = 0.0
+        self.start()
+
+    def start(self):
+        """Restart the clock at step 0"""
+        self.step = 0
+        self.dropped = 0
+        self._origin = self._last = time.monotonic()
+
+    def tick(self):
+        """Wait for the next step and return how many steps have passed
+        since the previous tick: 1 on time, more when running behind.
+        Headless backends never wait or fall behind (see sleep)."""
+        passed, delay = self._advance()
+        if delay > 0:
+            time.sleep(delay)
+        self._last = time.monotonic()
+        return passed
+
+    async def tickAsync(self):
+        """tick for coroutines: other tasks run during the wait"""
+        passed, delay = self._advance()
+        await asyncio.sleep(max(0, delay))
+        self._last = time.monotonic()
+        return passed
+
+    def _advance(self):
+        # Count the steps passed since the previous tick and return
+        #   them with the time left to wait for the next one
+        now = time.monotonic()
+        self.frameTime = now - self._last
+        passed = 1
+        delay = 0
+        if _backend == "tk":
+            elapsed = int((now - self._origin) * self.rate)
+            if elapsed <= self.step:
+                delay = self._origin + (self.step + 1) / float(self.rate) - now
+            else:
+                passed = elapsed - self.step
+        self.step = self.step + passed
+        self.dropped = self.dropped + passed - 1
+        return passed, delay
+
+    def steps(self, sequence):
+        """Restart the clock and yield the items of sequence one step
+        apart, leaving out those whose step has already passed when the
+        loop runs behind. The last item is always produced, and the
+        whole loop takes len(sequence) steps."""
+        if not isinstance(sequence, (list, tuple, range)):
+            sequence = list(sequence)
+        last = len(sequence) - 1
+        self.start()
+        i = 0
+        while i <= last:
+            yield sequence[i]
+            passed = self.tick()
+            if i == last: break
+            i = min(i + passed, last)
+
+    async def stepsAsync(self, sequence):
+        """steps for coroutines, to be used with async for"""
+        if not isinstance(sequence, (list, tuple, range)):
+            sequence = list(sequence)
+        last = len(sequence) - 1
+        self.start()
+        i = 0
+        while i <= last:
+            yield sequence[i]
+            passed = await self.tickAsync()
+            if i == last: break
+            i = min(i + passed, last)
 
 ############################################################################
 # Graphics classes start here
+
+# A buffered mouse click or key press. kind is "mouse" or "key", time is
+# the time.time() of arrival, x and y are the world coordinates of a
+# click, button its mouse button and key the keysym of a key press.
+InputEvent = namedtuple("InputEvent", "kind time x y button key")
+
+# Number of input events a GraphWin keeps before dropping the oldest
+EVENT_BUFFER_SIZE = 256
+
+# Frames per second at which a GraphWin advances running animations
+ANIMATION_RATE = 60
         
 class GraphWin(tk.Canvas):
 
     """A GraphWin is a toplevel window for displaying graphics."""
 
+    headless = False
+
+    # Whether frames send their canvas changes to Tcl as a single script
+    #   (see begin_frame). _batch is the _TclBatch of a Tk window.
+    batching = True
+    _batch = None
+
+    def __new__(cls, *args, **kw):
+        # Windows created under a headless backend are instances of a
+        # subclass that replaces the Tk canvas with an in-memory one.
+        if _backend != "tk" and not cls.headless:
+            cls = _headlessClass(cls, _backend)
+        return tk.Canvas.__new__(cls)
+
     def __init__(self, title="Graphics Window",
                  width=200, height=200, autoflush=True):
         assert type(title) == type(""), "Title must be a string"
-        master = tk.Toplevel(_root)
-        master.protocol("WM_DELETE_WINDOW", self.close)
-        tk.Canvas.__init__(self, master, width=width, height=height,
-                           highlightthickness=0, bd=0)
-        self.master.title(title)
-        self.pack()
-        master.resizable(0,0)
+        self._open(title, width, height)
         self.foreground = "black"
-        self.items = []
+        self.items = {} # drawn objects keyed by Tk id, in drawing order
         self.mouseX = None
         self.mouseY = None
+        self._events = deque(maxlen=EVENT_BUFFER_SIZE)
         self.bind("<Button-1>", self._onClick)
         self.bind_all("<Key>", self._onKey)
         self.height = int(height)
@@ -229,9 +456,55 @@ class GraphWin(tk.Canvas):
         self._mouseCallback = None
         self.trans = None
         self.closed = False
-        master.lift()
         self.lastKey = ""
-        if autoflush: _root.update()
+        # begin_frame/commit_frame nesting depth and whether an update
+        # has been deferred until the outermost frame is committed
+        self._frameDepth = 0
+        self._framePending = False
+        # number of object reconfigurations that were dropped because
+        # the option already had the requested value
+        self.elidedConfigs = 0
+        # pixel layer used by plot_many (see usePixelLayer) and the
+        # pixels written to it during the current frame
+        self._pixelPhoto = None
+        self._pixelItem = None
+        self._pixelsOn = False
+        self._pixelsPending = {}
+        # running animations (see GraphicsObject.animate) and the timer
+        # that steps them
+        self._tweens = []
+        self._tweenTimer = None
+        # command queues fed by worker threads (see CommandQueue)
+        self._queues = []
+        # (kind, future) for coroutines waiting for "input" or the
+        #   next "animation" step (see mouse, key and Tween)
+        self._futures = []
+        # clickable regions in the order added, and the grid indexing
+        #   them, built when first needed (see addRegion)
+        self._regions = []
+        self._regionGrid = None
+        # named layers, bottom first (see layer)
+        self._layers = []
+        # counters kept while the window is instrumented (see instrument)
+        self._stats = None
+        if autoflush: self.update()
+
+    def _open(self, title, width, height):
+        # Create the toplevel window holding this canvas
+        master = tk.Toplevel(_tkRoot())
+        master.protocol("WM_DELETE_WINDOW", self.close)
+        tk.Canvas.__init__(self, master, width=width, height=height,
+                           highlightthickness=0, bd=0)
+        # canvas changes made in a frame are sent to Tcl as one script
+        self._batch = self.tk = _TclBatch(self.tk, self._w)
+        self.master.title(title)
+        self.pack()
+        master.resizable(0,0)
+        master.lift()
+        # set by input handlers and close() to wake up _waitInput
+        self._inputVar = tk.IntVar(_root)
+        # set after every animation step to wake up Tween.join
+        self._animVar = tk.IntVar(_root)
 
     def __repr__(self):
         if self.isClosed():
@@ -250,18 +523,22 @@ class GraphWin(tk.Canvas):
 
     def _onKey(self, evnt):
         self.lastKey = evnt.keysym
+        self._events.append(InputEvent("key", time.time(), None, None,
+                                       None, evnt.keysym))
+        self._wakeInput()
 
 
     def setBackground(self, color):
         """Set background color of the window"""
         self.__checkOpen()
         self.config(bg=color)
-        self.__autoflush()
+        self._autoflush()
         
     def setCoords(self, x1, y1, x2, y2):
         """Set coordinates of window to run from (x1,y1) in the
         lower-left corner to (x2,y2) in the upper-right corner."""
         self.trans = Transform(self.width, self.height, x1, y1, x2, y2)
+        self._regionGrid = None
         self.redraw()
 
     def close(self):
@@ -269,8 +546,15 @@ class GraphWin(tk.Canvas):
 
         if self.closed: return
         self.closed = True
+        self._wakeInput()
+        self._stopAnimations()
+        for queue in list(self._queues):
+            queue.close()
+        if self._batch is not None:
+            self._batch.batching = False
+            self._batch.script = []
         self.master.destroy()
-        self.__autoflush()
+        self._autoflush()
 
 
     def isClosed(self):
@@ -281,43 +565,232 @@ class GraphWin(tk.Canvas):
         return not self.closed
 
 
-    def __autoflush(self):
+    def _autoflush(self):
+        # Called after every drawing operation. Inside a frame the
+        # update is deferred until the frame is committed.
         if self.autoflush:
-            _root.update()
-
+            if self._frameDepth:
+                self._framePending = True
+            else:
+                self.update()
+
+    def begin_frame(self):
+        """Start a frame. Drawing operations made until the matching
+        commit_frame are shown together by a single update. Frames
+        may be nested; only the outermost commit updates the window.
+
+        While the frame lasts, the canvas changes of a Tk window are
+        collected into a Tcl script, which runs with one call to Tcl
+        when the frame is committed, or sooner if anything else has to
+        go to Tcl first. Errors in them are then raised by that call.
+        Set batching to False to send every change at once instead."""
+        self._frameDepth = self._frameDepth + 1
+        if self._frameDepth == 1 and self._batch is not None:
+            self._batch.batching = self.batching
+
+    def commit_frame(self):
+        """End the current frame, updating the window once if anything
+        was drawn, moved or reconfigured during it."""
+        if self._frameDepth == 0:
+            raise GraphicsError("commit_frame without begin_frame")
+        self._frameDepth = self._frameDepth - 1
+        if self._frameDepth == 0:
+            batch = self._batch
+            if batch is not None:
+                batch.batching = False
+                if batch.script and not self.closed:
+                    batch.flush()
+            if self._pixelsPending and not self.closed:
+                self._writePixels(self._pixelsPending)
+                self._pixelsPending = {}
+            if self._framePending:
+                self._framePending = False
+                if not self.closed:
+                    self.update()
+
+    @contextmanager
+    def frame(self):
+        """Context manager wrapping begin_frame/commit_frame:
+
+            with win.frame():
+                for line in lines:
+                    line.setOutline(color)
+        """
+        self.begin_frame()
+        try:
+            yield self
+        finally:
+            self.commit_frame()
+
+
+    instrumented = False
+
+    def instrument(self, enabled=True):
+        """Start (or with enabled False, stop) counting the canvas calls
+        this window makes by type, timing its update passes and
+        recording how long its frames take. The figures are returned by
+        stats. An uninstrumented window pays nothing for this."""
+        if enabled == self.instrumented:
+            return
+        if enabled:
+            if self._stats is None:
+                self._stats = _newStats()
+            self.__class__ = _instrumentedClass(type(self))
+        else:
+            self.__class__ = type(self)._plainClass
+
+    def stats(self, reset=False):
+        """Return the figures gathered while the window was instrumented:
+            calls       canvas calls made, by type ("create",
+                        "itemconfig", "coords", "move", "delete",
+                        "restack", "config", "update")
+            updates     number of update passes and updateTime the
+                        seconds spent in them (updateMax the longest)
+            frames      number of frames committed, frameTime the
+                        seconds spent in them (frameMax the longest)
+                        and histogram the number of frames taking at
+                        most each of FRAME_BUCKETS milliseconds
+        With reset True the figures start again from zero."""
+        stats = _copyStats(self._stats or _newStats())
+        if reset and self._stats is not None:
+            self._stats = _newStats()
+        return stats
+
+    @contextmanager
+    def profile(self):
+        """Context manager instrumenting the window for the duration of
+        a with statement. It yields a dictionary that is filled in with
+        the stats of just that block when it ends:
+
+            with win.profile() as stats:
+                backdrop.show()
+            print(stats["calls"], stats["frameMax"])
+        """
+        wasOn = self.instrumented
+        self.instrument(True)
+        before = self.stats()
+        result = {}
+        try:
+            yield result
+        finally:
+            result.update(_diffStats(self.stats(), before))
+            if not wasOn:
+                self.instrument(False)
     
     def plot(self, x, y, color="black"):
         """Set pixel (x,y) to the given color"""
         self.__checkOpen()
         xs,ys = self.toScreen(x,y)
+        if self._pixelsOn:
+            self._setPixels([(xs, ys, color)])
+            return
         self.create_line(xs,ys,xs+1,ys, fill=color)
-        self.__autoflush()
+        self._autoflush()
         
     def plotPixel(self, x, y, color="black"):
         """Set pixel raw (independent of window coordinates) pixel
         (x,y) to color"""
         self.__checkOpen()
+        if self._pixelsOn:
+            self._setPixels([(x, y, color)])
+            return
         self.create_line(x,y,x+1,y, fill=color)
-        self.__autoflush()
+        self._autoflush()
+
+    def plot_many(self, points, colors="black"):
+        """Set many pixels at once. points is an iterable of Points or
+        (x,y) pairs in window coordinates and colors is either one color
+        for all of them or a sequence with one color per point.
+        The pixels go to the pixel layer (see usePixelLayer), so no
+        canvas items are created, and within a frame they are written
+        when the frame is committed."""
+        self.__checkOpen()
+        points = list(points)
+        if isinstance(colors, str):
+            colors = [colors] * len(points)
+        else:
+            colors = list(colors)
+            if len(colors) != len(points):
+                raise GraphicsError("plot_many needs one color per point")
+        pixels = []
+        toScreen = self.toScreen
+        for p, color in zip(points, colors):
+            if isinstance(p, (tuple, list)):
+                xs,ys = toScreen(p[0], p[1])
+            else:
+                xs,ys = toScreen(p.x, p.y)
+            pixels.append((xs, ys, color))
+        self._setPixels(pixels)
+
+    def usePixelLayer(self, enabled=True):
+        """Make plot and plotPixel write into the pixel layer instead of
+        creating a one-pixel canvas item per call. The layer is a single
+        image covering the window, below all other items, so the number
+        of canvas items stays the same however many pixels are plotted."""
+        self._pixelsOn = enabled
+
+    def _setPixels(self, pixels):
+        # pixels is a list of (x, y, color) in screen coordinates
+        if self._pixelPhoto is None:
+            self._pixelPhoto = _photoImage(width=self.width,
+                                           height=self.height)
+            self._pixelItem = self.create_image(0, 0, image=self._pixelPhoto,
+                                                anchor="nw")
+            self.tag_lower(self._pixelItem)
+        width, height = self.width, self.height
+        pending = self._pixelsPending
+        for x, y, color in pixels:
+            x, y = int(x), int(y)
+            if 0 <= x < width and 0 <= y < height:
+                pending[x, y] = color
+        if not self._frameDepth:
+            self._writePixels(pending)
+            self._pixelsPending = {}
+        self._autoflush()
+
+    def _writePixels(self, pixels):
+        # Write a {(x,y): color} dictionary to the pixel layer with one
+        #   PhotoImage put per horizontal run of adjacent pixels
+        put = self._pixelPhoto.put
+        run = []
+        for (x, y) in sorted(pixels, key=lambda p: (p[1], p[0])):
+            if run and (y != runY or x != runX + len(run)):
+                put("{" + " ".join(run) + "}", (runX, runY))
+                run = []
+            if not run:
+                runX, runY = x, y
+            run.append(pixels[x, y])
+        if run:
+            put("{" + " ".join(run) + "}", (runX, runY))
+      
+    def snapshot(self):
+        """Return a Frame with the current contents of the window as an
+        RGB image. Only windows of the raster backend can do this."""
+        raise GraphicsError("snapshot needs the raster backend")
       
     def flush(self):
         """Update drawing to the window"""
         self.__checkOpen()
         self.update_idletasks()
         
-    def getMouse(self):
+    def getMouse(self, timeout=None):
         """Wait for mouse click and return Point object representing
-        the click"""
+        the click. If timeout (in seconds) is given and no click
+        arrives in time, returns None."""
         self.update()      # flush any prior clicks
         self.mouseX = None
         self.mouseY = None
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
         while self.mouseX == None or self.mouseY == None:
-            self.update()
             if self.isClosed(): raise GraphicsError("getMouse in closed window")
-            time.sleep(.1) # give up thread
+            if not self._waitInput(deadline):
+                return None
         x,y = self.toWorld(self.mouseX, self.mouseY)
         self.mouseX = None
         self.mouseY = None
+        self._takeEvent("mouse")
         return Point(x,y)
 
     def checkMouse(self):
@@ -330,20 +803,54 @@ class GraphWin(tk.Canvas):
             x,y = self.toWorld(self.mouseX, self.mouseY)
             self.mouseX = None
             self.mouseY = None
+            self._takeEvent("mouse")
             return Point(x,y)
         else:
             return None
 
-    def getKey(self):
-        """Wait for user to press a key and return it as a string."""
+    def getKey(self, timeout=None):
+        """Wait for user to press a key and return it as a string. If
+        timeout (in seconds) is given and no key is pressed in time,
+        returns None."""
         self.lastKey = ""
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
         while self.lastKey == "":
-            self.update()
             if self.isClosed(): raise GraphicsError("getKey in closed window")
-            time.sleep(.1) # give up thread
+            if not self._waitInput(deadline):
+                return None
+
+        key = self.lastKey
+        self.lastKey = ""
+        self._takeEvent("key")
+        return key
 
+    async def mouse(self):
+        """Coroutine version of getMouse: other tasks keep running
+        until the click arrives. Use asyncio.wait_for for a timeout."""
+        self.update()      # flush any prior clicks
+        self.mouseX = None
+        self.mouseY = None
+        while self.mouseX == None or self.mouseY == None:
+            if self.isClosed(): raise GraphicsError("mouse in closed window")
+            await self._nextInput()
+        x,y = self.toWorld(self.mouseX, self.mouseY)
+        self.mouseX = None
+        self.mouseY = None
+        self._takeEvent("mouse")
+        return Point(x,y)
+
+    async def key(self):
+        """Coroutine version of getKey: other tasks keep running until
+        a key is pressed. Use asyncio.wait_for for a timeout."""
+        self.lastKey = ""
+        while self.lastKey == "":
+            if self.isClosed(): raise GraphicsError("key in closed window")
+            await self._nextInput()
         key = self.lastKey
         self.lastKey = ""
+        self._takeEvent("key")
         return key
 
     def checkKey(self):
@@ -353,8 +860,240 @@ class GraphWin(tk.Canvas):
         self.update()
         key = self.lastKey
         self.lastKey = ""
+        if key:
+            self._takeEvent("key")
         return key
+
+    def poll_events(self):
+        """Return a list of the buffered input events (oldest first)
+        without removing them. Clicks and key presses are buffered as
+        they arrive, including during long animations, up to
+        EVENT_BUFFER_SIZE events. Events returned by getMouse,
+        checkMouse, getKey and checkKey are taken out of the buffer."""
+        if self.isClosed():
+            raise GraphicsError("poll_events in closed window")
+        self.update()
+        return list(self._events)
+
+    def drain_events(self):
+        """Return a list of the buffered input events (oldest first)
+        and empty the buffer."""
+        if self.isClosed():
+            raise GraphicsError("drain_events in closed window")
+        self.update()
+        events = list(self._events)
+        self._events.clear()
+        return events
+
+    def addRegion(self, shape, handler=None, value=None):
+        """Make the area of shape, a Rectangle or Polygon, clickable and
+        return the Region for it. getRegion resolves clicks to regions,
+        the last added first where they overlap; handler, if given, is
+        then called with the click Point. value is kept on the Region
+        for the caller, e.g. the index of a menu option. The region
+        takes the shape's current position; the shape need not be drawn."""
+        region = Region(shape, handler, value)
+        self._regions.append(region)
+        if self._regionGrid is not None:
+            self._indexRegion(region)
+        return region
+
+    def removeRegion(self, region):
+        """Stop region being clickable"""
+        if region in self._regions:
+            self._regions.remove(region)
+            self._regionGrid = None
+
+    def regionAt(self, x, y):
+        """Return the region containing point (x,y), in the window's
+        coordinates, or None. Only the regions indexed under the point's
+        grid cell are tested."""
+        if self._regionGrid is None:
+            self._regionGrid = {}
+            for region in self._regions:
+                self._indexRegion(region)
+        xs, ys = self.toScreen(x, y)
+        cell = (int(xs) // REGION_CELL_SIZE, int(ys) // REGION_CELL_SIZE)
+        for region in reversed(self._regionGrid.get(cell, ())):
+            if region.contains(x, y):
+                return region
+        return None
+
+    def _indexRegion(self, region):
+        # Add region to every grid cell its bounding box touches
+        corners = [self.toScreen(x, y) for x, y in region.points]
+        x1 = int(min(x for x, y in corners)) // REGION_CELL_SIZE
+        x2 = int(max(x for x, y in corners)) // REGION_CELL_SIZE
+        y1 = int(min(y for x, y in corners)) // REGION_CELL_SIZE
+        y2 = int(max(y for x, y in corners)) // REGION_CELL_SIZE
+        grid = self._regionGrid
+        for cx in range(x1, x2 + 1):
+            for cy in range(y1, y2 + 1):
+                grid.setdefault((cx, cy), []).append(region)
+
+    def getRegion(self, timeout=None):
+        """Wait for a click inside a region (see addRegion), call its
+        handler and return the region. Clicks outside every region are
+        ignored. If timeout (in seconds) is given and no region is
+        clicked in time, returns None."""
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0, deadline - time.monotonic())
+            pick = self.getMouse(remaining)
+            if pick is None:
+                return None
+            region = self.regionAt(pick.x, pick.y)
+            if region is not None:
+                if region.handler is not None:
+                    region.handler(pick)
+                return region
+
+    async def region(self):
+        """Coroutine version of getRegion"""
+        while True:
+            pick = await self.mouse()
+            region = self.regionAt(pick.x, pick.y)
+            if region is not None:
+                if region.handler is not None:
+                    region.handler(pick)
+                return region
+
+    def layer(self, name, z=None):
+        """Return the Layer called name, creating it if there is none.
+        Layers are stacked by z, lowest at the bottom, and a new layer
+        goes above the others unless z is given. Objects added to a
+        layer are kept above those of lower layers and below those of
+        higher ones; objects drawn outside any layer stack as usual."""
+        for layer in self._layers:
+            if layer.name == name:
+                return layer
+        if z is None:
+            z = self._layers[-1].z + 1 if self._layers else 0
+        layer = Layer(self, name, z)
+        i = len(self._layers)
+        while i > 0 and self._layers[i-1].z > z:
+            i = i - 1
+        self._layers.insert(i, layer)
+        return layer
+
+    def layers(self):
+        """Return the window's layers, bottom first"""
+        return list(self._layers)
+
+    def _stackLayer(self, layer, tagOrId):
+        # Put the items of tagOrId, which belong to layer and are at
+        #   the top of the display list, below the items of the next
+        #   layer up that has any
+        i = self._layers.index(layer)
+        for upper in self._layers[i+1:]:
+            if upper._drawn():
+                self.tag_lower(tagOrId, upper.tag)
+                return
+
+    def _takeEvent(self, kind):
+        # Remove the most recent buffered event of the given kind
+        events = self._events
+        for i in range(len(events) - 1, -1, -1):
+            if events[i].kind == kind:
+                del events[i]
+                return
             
+    def _waitInput(self, deadline=None):
+        # Run the Tk event loop until an input event arrives or the
+        #   window is closed. Returns False if the deadline (a
+        #   time.monotonic() value) passed first.
+        var = self._inputVar
+        var.set(0)
+        timer = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            timer = self.after(int(remaining * 1000) + 1, var.set, 2)
+        self.wait_variable(var)
+        if timer is not None:
+            self.after_cancel(timer)
+        return var.get() != 2
+
+    def _wakeInput(self):
+        self._inputVar.set(1)
+        self._resolve("input")
+
+    def _nextInput(self):
+        # Awaitable for the next input event (see _waitInput)
+        return self._future("input")
+
+    def _nextAnimation(self):
+        # Awaitable for the next animation step (see _waitAnimation)
+        return self._future("animation")
+
+    def _future(self, kind):
+        future = asyncio.get_running_loop().create_future()
+        self._futures.append((kind, future))
+        return future
+
+    def _resolve(self, kind):
+        # Wake the coroutines waiting for kind
+        if self._futures:
+            waiting = self._futures
+            self._futures = [w for w in waiting if w[0] != kind]
+            for k, future in waiting:
+                if k == kind and not future.done():
+                    future.set_result(None)
+
+    def _addTween(self, tween):
+        self._tweens.append(tween)
+        if self._tweenTimer is None:
+            self._tweenTimer = self.after(1000 // ANIMATION_RATE, self._tick)
+
+    def _tick(self):
+        # Advance every running animation by one step. All of them are
+        #   shown by the single update of one frame.
+        self._tweenTimer = None
+        if self.closed: return
+        now = self._animationTime()
+        with self.frame():
+            for tween in list(self._tweens):
+                if tween._step(now):
+                    self._tweens.remove(tween)
+        if self._tweens and self._tweenTimer is None and not self.closed:
+            self._tweenTimer = self.after(1000 // ANIMATION_RATE, self._tick)
+        self._animVar.set(1)
+        self._resolve("animation")
+
+    def _animationTime(self):
+        return time.monotonic()
+
+    def _resetItem(self, id, type, options):
+        # Give item id, of the given type, the options and set every
+        #   other option back to its default, with one itemconfig. The
+        #   defaults of each type are read from the first such item.
+        defaults = _itemDefaults.get(type)
+        if defaults is None:
+            defaults = _itemDefaults[type] = dict(
+                (option, spec[3])
+                for option, spec in self.itemconfigure(id).items()
+                if len(spec) == 5)
+        self.itemconfig(id, dict(defaults, **options))
+
+    def _waitAnimation(self):
+        # Run the Tk event loop until the next animation step
+        self.wait_variable(self._animVar)
+
+    def _stopAnimations(self):
+        for tween in self._tweens:
+            tween.done = True
+        self._tweens = []
+        if self._tweenTimer is not None:
+            self.after_cancel(self._tweenTimer)
+            self._tweenTimer = None
+        self._animVar.set(1)
+        self._resolve("animation")
+
     def getHeight(self):
         """Return the height of the window"""
         return self.height
@@ -383,19 +1122,24 @@ class GraphWin(tk.Canvas):
     def _onClick(self, e):
         self.mouseX = e.x
         self.mouseY = e.y
+        x,y = self.toWorld(e.x, e.y)
+        self._events.append(InputEvent("mouse", time.time(), x, y,
+                                       getattr(e, "num", 1), None))
         if self._mouseCallback:
             self._mouseCallback(Point(e.x, e.y))
+        self._wakeInput()
 
     def addItem(self, item):
-        self.items.append(item)
+        self.items[item.id] = item
 
     def delItem(self, item):
-        self.items.remove(item)
+        del self.items[item.id]
 
     def redraw(self):
-        for item in self.items[:]:
-            item.undraw()
-            item.draw(self)
+        # Move the existing canvas items to their new screen
+        # coordinates rather than deleting and recreating them.
+        for item in self.items.values():
+            self.coords(item.id, item._coords(self))
         self.update()
         
                       
@@ -427,6 +1171,50 @@ class Transform:
         return x,y
 
 
+# Side in pixels of the grid cells GraphWin indexes its regions by
+REGION_CELL_SIZE = 32
+
+class Region:
+
+    """A clickable area of a window, as returned by GraphWin.addRegion.
+    A point on the left or top edge of a Rectangle region is inside it
+    and one on the right or bottom edge is not, so regions placed side
+    by side leave no gaps and do not overlap."""
+
+    def __init__(self, shape, handler, value):
+        if isinstance(shape, Rectangle):
+            x1, x2 = sorted((shape.p1.x, shape.p2.x))
+            y1, y2 = sorted((shape.p1.y, shape.p2.y))
+            self.points = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+            self.box = (x1, y1, x2, y2)
+        elif isinstance(shape, Polygon):
+            self.points = [(p.x, p.y) for p in shape.points]
+            self.box = None
+        else:
+            raise GraphicsError(UNSUPPORTED_METHOD)
+        self.handler = handler
+        self.value = value
+
+    def __repr__(self):
+        return "Region({}, {})".format(self.points, self.value)
+
+    def contains(self, x, y):
+        """Returns True if point (x,y) is in the region"""
+        if self.box is not None:
+            x1, y1, x2, y2 = self.box
+            return x1 <= x < x2 and y1 <= y < y2
+        # Even-odd rule, counting the edges crossed by a ray to the right
+        inside = False
+        points = self.points
+        xj, yj = points[-1]
+        for xi, yi in points:
+            if (yi > y) != (yj > y) and \
+               x < xi + (y - yi) * (xj - xi) / float(yj - yi):
+                inside = not inside
+            xj, yj = xi, yi
+        return inside
+
+
 # Default values for various item configuration options. Only a subset of
 #   keys may be present in the configuration dictionary for a given item
 DEFAULT_CONFIG = {"fill":"",
@@ -442,6 +1230,16 @@ class GraphicsObject:
     """Generic base class for all of the drawable objects"""
     # A subclass of GraphicsObject should override _draw and
     #   and _move methods.
+
+    # Canvas tags given to the object when it is drawn (see Group)
+    tags = ()
+
+    # Whether the object's item is hidden (see hide)
+    hidden = False
+
+    # The configuration options written by setFill and setOutline
+    _fillOption = "fill"
+    _outlineOption = "outline"
     
     def __init__(self, options):
         # options is a list of strings indicating which options are
@@ -481,12 +1279,22 @@ class GraphicsObject:
         if self.canvas and not self.canvas.isClosed(): raise GraphicsError(OBJ_ALREADY_DRAWN)
         if graphwin.isClosed(): raise GraphicsError("Can't draw to closed window")
         self.canvas = graphwin
-        self.id = self._draw(graphwin, self.config)
+        self.id = self._draw(graphwin, self._drawOptions())
         graphwin.addItem(self)
-        if graphwin.autoflush:
-            _root.update()
+        graphwin._autoflush()
         return self
 
+    def _drawOptions(self):
+        # The options the object's item is created with
+        options = self.config
+        if self.tags or self.hidden:
+            options = dict(options)
+            if self.tags:
+                options["tags"] = self.tags
+            if self.hidden:
+                options["state"] = "hidden"
+        return options
+
             
     def undraw(self):
 
@@ -497,12 +1305,35 @@ class GraphicsObject:
         if not self.canvas.isClosed():
             self.canvas.delete(self.id)
             self.canvas.delItem(self)
-            if self.canvas.autoflush:
-                _root.update()
+            self.canvas._autoflush()
         self.canvas = None
         self.id = None
 
 
+    def hide(self):
+
+        """Hide the object without undrawing it, by setting the state
+        of its canvas item. It keeps its position and configuration
+        and may still be changed while hidden. An object hidden before
+        it is drawn is drawn hidden."""
+
+        self._setState(True)
+
+    def show(self):
+
+        """Show the object again after hide"""
+
+        self._setState(False)
+
+    def _setState(self, hidden):
+        if hidden == self.hidden:
+            return
+        self.hidden = hidden
+        canvas = self.canvas
+        if canvas and not canvas.isClosed():
+            canvas.itemconfig(self.id, state="hidden" if hidden else "normal")
+            canvas._autoflush()
+
     def move(self, dx, dy):
 
         """move object dx units in x direction and dy units in y
@@ -519,21 +1350,50 @@ class GraphicsObject:
                 x = dx
                 y = dy
             self.canvas.move(self.id, x, y)
-            if canvas.autoflush:
-                _root.update()
+            canvas._autoflush()
+
+    def animate(self, duration=0.5, easing="linear", fill=None,
+                outline=None, width=None, size=None, dx=0, dy=0):
+
+        """Gradually change the object over duration seconds: fill and
+        outline fade to the given colors, width and size (of Text) grow
+        or shrink to the given values and the object moves by dx,dy.
+        easing is the name of one of the curves in EASINGS or a
+        function from [0,1] to [0,1]. The object must be drawn.
+
+        Returns at once with a Tween; call its join method (or in a
+        coroutine, await it) to wait for the animation to finish. All
+        the animations running in a window are advanced together,
+        ANIMATION_RATE times a second, with one update per step."""
+
+        canvas = self.canvas
+        if not canvas or canvas.isClosed():
+            raise GraphicsError("Can't animate an object that is not drawn")
+        tween = Tween(self, duration, easing, fill, outline, width, size,
+                      dx, dy)
+        canvas._addTween(tween)
+        return tween
            
     def _reconfig(self, option, setting):
         # Internal method for changing configuration of the object
         # Raises an error if the option does not exist in the config
         #    dictionary for this object
-        if option not in self.config:
-            raise GraphicsError(UNSUPPORTED_METHOD)
+        # Only the changed option is sent to Tk, and nothing at all
+        #    if the setting is unchanged.
         options = self.config
+        if option not in options:
+            raise GraphicsError(UNSUPPORTED_METHOD)
+        canvas = self.canvas
+        if options[option] == setting:
+            if canvas and not canvas.isClosed():
+                canvas.elidedConfigs = canvas.elidedConfigs + 1
+            return
         options[option] = setting
-        if self.canvas and not self.canvas.isClosed():
-            self.canvas.itemconfig(self.id, options)
-            if self.canvas.autoflush:
-                _root.update()
+        if canvas and not canvas.isClosed():
+            if option == "font":
+                setting = _font(setting, canvas.headless).name
+            canvas.itemconfig(self.id, {option: setting})
+            canvas._autoflush()
 
 
     def _draw(self, canvas, options):
@@ -542,24 +1402,71 @@ class GraphicsObject:
         pass # must override in subclass
 
 
+    def _coords(self, canvas):
+        """returns the list of screen coordinates of the figure on
+        canvas, as expected by the canvas coords method"""
+        pass # must override in subclass
+
+
     def _move(self, dx, dy):
         """updates internal state of object to move it dx,dy units"""
         pass # must override in subclass
 
          
+class _Coord:
+    # Internal lightweight point used for the corners and anchors of
+    #   the other objects. Treated as immutable: moving an object
+    #   replaces its _Coords rather than changing them.
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = float(x)
+        self.y = float(y)
+
+    def __repr__(self):
+        return "Point({}, {})".format(self.x, self.y)
+
+    def getX(self): return self.x
+    def getY(self): return self.y
+
+
 class Point(GraphicsObject):
+
+    # Points are created in large numbers (getMouse, getP1, getPoints,
+    #   ...) but seldom drawn, so a Point only stores x and y until its
+    #   configuration is first needed.
+    canvas = None
+    id = None
+    _fillOption = "outline"
+
     def __init__(self, x, y):
-        GraphicsObject.__init__(self, ["outline", "fill"])
-        self.setFill = self.setOutline
         self.x = float(x)
         self.y = float(y)
 
+    def _getConfig(self):
+        config = self.__dict__.get("_config")
+        if config is None:
+            config = self._config = {"outline": DEFAULT_CONFIG["outline"],
+                                     "fill": DEFAULT_CONFIG["fill"]}
+        return config
+
+    def _setConfig(self, config):
+        self._config = config
+
+    config = property(_getConfig, _setConfig)
+
     def __repr__(self):
         return "Point({}, {})".format(self.x, self.y)
+
+    def setFill(self, color):
+        self.setOutline(color)
         
     def _draw(self, canvas, options):
+        return canvas.create_rectangle(self._coords(canvas), options)
+
+    def _coords(self, canvas):
         x,y = canvas.toScreen(self.x,self.y)
-        return canvas.create_rectangle(x,y,x+1,y+1,options)
+        return [x,y,x+1,y+1]
         
     def _move(self, dx, dy):
         self.x = self.x + dx
@@ -567,7 +1474,8 @@ class Point(GraphicsObject):
         
     def clone(self):
         other = Point(self.x,self.y)
-        other.config = self.config.copy()
+        if "_config" in self.__dict__:
+            other.config = self.config.copy()
         return other
                 
     def getX(self): return self.x
@@ -579,18 +1487,25 @@ class _BBox(GraphicsObject):
     
     def __init__(self, p1, p2, options=["outline","width","fill"]):
         GraphicsObject.__init__(self, options)
-        self.p1 = p1.clone()
-        self.p2 = p2.clone()
+        self.p1 = _Coord(p1.x, p1.y)
+        self.p2 = _Coord(p2.x, p2.y)
 
     def _move(self, dx, dy):
-        self.p1.x = self.p1.x + dx
-        self.p1.y = self.p1.y + dy
-        self.p2.x = self.p2.x + dx
-        self.p2.y = self.p2.y  + dy
+        p1 = self.p1
+        p2 = self.p2
+        self.p1 = _Coord(p1.x + dx, p1.y + dy)
+        self.p2 = _Coord(p2.x + dx, p2.y + dy)
+
+    def _coords(self, canvas):
+        p1 = self.p1
+        p2 = self.p2
+        x1,y1 = canvas.toScreen(p1.x,p1.y)
+        x2,y2 = canvas.toScreen(p2.x,p2.y)
+        return [x1,y1,x2,y2]
                 
-    def getP1(self): return self.p1.clone()
+    def getP1(self): return Point(self.p1.x, self.p1.y)
 
-    def getP2(self): return self.p2.clone()
+    def getP2(self): return Point(self.p2.x, self.p2.y)
     
     def getCenter(self):
         p1 = self.p1
@@ -607,11 +1522,7 @@ class Rectangle(_BBox):
         return "Rectangle({}, {})".format(str(self.p1), str(self.p2))
     
     def _draw(self, canvas, options):
-        p1 = self.p1
-        p2 = self.p2
-        x1,y1 = canvas.toScreen(p1.x,p1.y)
-        x2,y2 = canvas.toScreen(p2.x,p2.y)
-        return canvas.create_rectangle(x1,y1,x2,y2,options)
+        return canvas.create_rectangle(self._coords(canvas), options)
         
     def clone(self):
         other = Rectangle(self.p1, self.p2)
@@ -634,17 +1545,13 @@ class Oval(_BBox):
         return other
    
     def _draw(self, canvas, options):
-        p1 = self.p1
-        p2 = self.p2
-        x1,y1 = canvas.toScreen(p1.x,p1.y)
-        x2,y2 = canvas.toScreen(p2.x,p2.y)
-        return canvas.create_oval(x1,y1,x2,y2,options)
+        return canvas.create_oval(self._coords(canvas), options)
     
 class Circle(Oval):
     
     def __init__(self, center, radius):
-        p1 = Point(center.x-radius, center.y-radius)
-        p2 = Point(center.x+radius, center.y+radius)
+        p1 = _Coord(center.x-radius, center.y-radius)
+        p2 = _Coord(center.x+radius, center.y+radius)
         Oval.__init__(self, p1, p2)
         self.radius = radius
 
@@ -661,6 +1568,8 @@ class Circle(Oval):
 
                   
 class Line(_BBox):
+
+    _outlineOption = "fill"
     
     def __init__(self, p1, p2):
         _BBox.__init__(self, p1, p2, ["arrow","fill","width"])
@@ -676,11 +1585,7 @@ class Line(_BBox):
         return other
   
     def _draw(self, canvas, options):
-        p1 = self.p1
-        p2 = self.p2
-        x1,y1 = canvas.toScreen(p1.x,p1.y)
-        x2,y2 = canvas.toScreen(p2.x,p2.y)
-        return canvas.create_line(x1,y1,x2,y2,options)
+        return canvas.create_line(self._coords(canvas), options)
         
     def setArrow(self, option):
         if not option in ["first","last","both","none"]:
@@ -694,39 +1599,61 @@ class Polygon(GraphicsObject):
         # if points passed as a list, extract it
         if len(points) == 1 and type(points[0]) == type([]):
             points = points[0]
-        self.points = list(map(Point.clone, points))
+        # vertices are kept as one flat tuple (x0, y0, x1, y1, ...)
+        xy = []
+        for p in points:
+            xy.append(float(p.x))
+            xy.append(float(p.y))
+        self.xy = tuple(xy)
         GraphicsObject.__init__(self, ["outline", "width", "fill"])
 
     def __repr__(self):
-        return "Polygon"+str(tuple(p for p in self.points))
+        return "Polygon"+str(tuple(self.points))
+
+    @property
+    def points(self):
+        xy = self.xy
+        return [_Coord(xy[i], xy[i+1]) for i in range(0, len(xy), 2)]
         
     def clone(self):
-        other = Polygon(*self.points)
+        other = Polygon()
+        other.xy = self.xy
         other.config = self.config.copy()
         return other
 
     def getPoints(self):
-        return list(map(Point.clone, self.points))
+        xy = self.xy
+        return [Point(xy[i], xy[i+1]) for i in range(0, len(xy), 2)]
 
     def _move(self, dx, dy):
-        for p in self.points:
-            p.move(dx,dy)
+        xy = list(self.xy)
+        for i in range(0, len(xy), 2):
+            xy[i] = xy[i] + dx
+            xy[i+1] = xy[i+1] + dy
+        self.xy = tuple(xy)
    
     def _draw(self, canvas, options):
-        args = [canvas]
-        for p in self.points:
-            x,y = canvas.toScreen(p.x,p.y)
-            args.append(x)
-            args.append(y)
-        args.append(options)
-        return GraphWin.create_polygon(*args) 
+        return canvas.create_polygon(self._coords(canvas), options)
+
+    def _coords(self, canvas):
+        xy = self.xy
+        if not canvas.trans:
+            return list(xy)
+        coords = []
+        for i in range(0, len(xy), 2):
+            x,y = canvas.toScreen(xy[i],xy[i+1])
+            coords.append(x)
+            coords.append(y)
+        return coords
 
 class Text(GraphicsObject):
+
+    _outlineOption = "fill"
     
     def __init__(self, p, text):
         GraphicsObject.__init__(self, ["justify","fill","text","font"])
         self.setText(text)
-        self.anchor = p.clone()
+        self.anchor = _Coord(p.x, p.y)
         self.setFill(DEFAULT_CONFIG['outline'])
         self.setOutline = self.setFill
 
@@ -734,12 +1661,17 @@ class Text(GraphicsObject):
         return "Text({}, '{}')".format(self.anchor, self.getText())
     
     def _draw(self, canvas, options):
+        # the item uses the shared named font rather than a description
+        options = dict(options,
+                       font=_font(options["font"], canvas.headless).name)
+        return canvas.create_text(self._coords(canvas), options)
+
+    def _coords(self, canvas):
         p = self.anchor
-        x,y = canvas.toScreen(p.x,p.y)
-        return canvas.create_text(x,y,options)
+        return list(canvas.toScreen(p.x,p.y))
         
     def _move(self, dx, dy):
-        self.anchor.move(dx,dy)
+        self.anchor = _Coord(self.anchor.x + dx, self.anchor.y + dy)
         
     def clone(self):
         other = Text(self.anchor, self.config['text'])
@@ -753,7 +1685,7 @@ class Text(GraphicsObject):
         return self.config["text"]
             
     def getAnchor(self):
-        return self.anchor.clone()
+        return Point(self.anchor.x, self.anchor.y)
 
     def setFace(self, face):
         if face in ['helvetica','arial','courier','times roman']:
@@ -779,15 +1711,36 @@ class Text(GraphicsObject):
     def setTextColor(self, color):
         self.setFill(color)
 
+    def measure(self, text=None):
+        """Return the (width, height) in pixels of text, by default the
+        Text's own text, when shown in the Text's font. Lines are
+        separated by newlines."""
+        if text is None:
+            text = self.config["text"]
+        return _measure(text, self.config["font"], self._headless())
+
+    def wrap(self, text, width):
+        """Return text with its words rearranged into lines no wider
+        than width pixels in the Text's font. Existing newlines are
+        kept, and a word wider than width gets a line of its own."""
+        return _wrap(text, self.config["font"], width, self._headless())
+
+    def _headless(self):
+        # Measure with the fonts of the window the Text is drawn in, or
+        #   failing that of the current backend
+        if self.canvas:
+            return self.canvas.headless
+        return _backend != "tk"
+
 
 class Entry(GraphicsObject):
 
     def __init__(self, p, width):
         GraphicsObject.__init__(self, [])
-        self.anchor = p.clone()
+        self.anchor = _Coord(p.x, p.y)
         #print self.anchor
         self.width = width
-        self.text = tk.StringVar(_root)
+        self.text = _stringVar()
         self.text.set("")
         self.fill = "gray"
         self.color = "black"
@@ -800,31 +1753,38 @@ class Entry(GraphicsObject):
     def _draw(self, canvas, options):
         p = self.anchor
         x,y = canvas.toScreen(p.x,p.y)
+        if canvas.headless:
+            return canvas.create_window(x,y,tags=options.get("tags", ()))
         frm = tk.Frame(canvas.master)
         self.entry = tk.Entry(frm,
                               width=self.width,
                               textvariable=self.text,
                               bg = self.fill,
                               fg = self.color,
-                              font=self.font)
+                              font=_font(self.font).name)
         self.entry.pack()
         #self.setFill(self.fill)
         self.entry.focus_set()
-        return canvas.create_window(x,y,window=frm)
+        return canvas.create_window(x,y,window=frm,
+                                    tags=options.get("tags", ()))
 
     def getText(self):
         return self.text.get()
 
     def _move(self, dx, dy):
-        self.anchor.move(dx,dy)
+        self.anchor = _Coord(self.anchor.x + dx, self.anchor.y + dy)
+
+    def _coords(self, canvas):
+        p = self.anchor
+        return list(canvas.toScreen(p.x,p.y))
 
     def getAnchor(self):
-        return self.anchor.clone()
+        return Point(self.anchor.x, self.anchor.y)
 
     def clone(self):
         other = Entry(self.anchor, self.width)
         other.config = self.config.copy()
-        other.text = tk.StringVar()
+        other.text = _stringVar()
         other.text.set(self.text.get())
         other.fill = self.fill
         return other
@@ -844,7 +1804,7 @@ class Entry(GraphicsObject):
         font[which] = value
         self.font = tuple(font)
         if self.entry:
-            self.entry.config(font=self.font)
+            self.entry.config(font=_font(self.font).name)
 
 
     def setFace(self, face):
@@ -878,14 +1838,16 @@ class Image(GraphicsObject):
     
     def __init__(self, p, *pixmap):
         GraphicsObject.__init__(self, [])
-        self.anchor = p.clone()
+        self.anchor = _Coord(p.x, p.y)
         self.imageId = Image.idCount
         Image.idCount = Image.idCount + 1
         if len(pixmap) == 1: # file name provided
-            self.img = tk.PhotoImage(file=pixmap[0], master=_root)
+            self.img = _loadPhoto(pixmap[0])
+            self._shared = True # with the image cache
         else: # width and height provided
             width, height = pixmap
-            self.img = tk.PhotoImage(master=_root, width=width, height=height)
+            self.img = _photoImage(width=width, height=height)
+            self._shared = False
 
     def __repr__(self):
         return "Image({}, {}, {})".format(self.anchor, self.getWidth(), self.getHeight())
@@ -894,10 +1856,15 @@ class Image(GraphicsObject):
         p = self.anchor
         x,y = canvas.toScreen(p.x,p.y)
         self.imageCache[self.imageId] = self.img # save a reference  
-        return canvas.create_image(x,y,image=self.img)
+        return canvas.create_image(x,y,image=self.img,
+                                   tags=options.get("tags", ()))
     
     def _move(self, dx, dy):
-        self.anchor.move(dx,dy)
+        self.anchor = _Coord(self.anchor.x + dx, self.anchor.y + dy)
+
+    def _coords(self, canvas):
+        p = self.anchor
+        return list(canvas.toScreen(p.x,p.y))
         
     def undraw(self):
         try:
@@ -907,15 +1874,32 @@ class Image(GraphicsObject):
         GraphicsObject.undraw(self)
 
     def getAnchor(self):
-        return self.anchor.clone()
+        return Point(self.anchor.x, self.anchor.y)
         
     def clone(self):
-        other = Image(Point(0,0), 0, 0)
-        other.img = self.img.copy()
-        other.anchor = self.anchor.clone()
+        # The clone shares the photo until either image changes a pixel
+        other = Image.__new__(Image)
+        GraphicsObject.__init__(other, [])
+        other.imageId = Image.idCount
+        Image.idCount = Image.idCount + 1
+        other.img = self.img
+        other.anchor = self.anchor
         other.config = self.config.copy()
+        self._shared = other._shared = True
         return other
 
+    def _own(self):
+        # Copy on write: give the image a photo of its own before its
+        #   pixels change if it may share the one it has. The photo of
+        #   a drawn image is swapped on its canvas item as well.
+        if self._shared:
+            self.img = self.img.copy()
+            self._shared = False
+            canvas = self.canvas
+            if canvas and not canvas.isClosed():
+                self.imageCache[self.imageId] = self.img
+                canvas.itemconfig(self.id, image=self.img)
+
     def getWidth(self):
         """Returns the width of the image in pixels"""
         return self.img.width() 
@@ -942,8 +1926,89 @@ class Image(GraphicsObject):
         """Sets pixel (x,y) to the given color
         
         """
+        self._own()
         self.img.put("{" + color +"}", (x, y))
-        
+
+    def get_region(self, x, y, width, height):
+        """Returns the pixels of the width x height rectangle with
+        upper-left corner (x,y) as a list of rows, each a list of
+        (r,g,b) tuples. The whole rectangle is read in one call."""
+        data = self._getRGB(x, y, width, height)
+        rows = []
+        for row in range(height):
+            start = row * width * 3
+            rows.append([tuple(data[i:i+3])
+                         for i in range(start, start + width * 3, 3)])
+        return rows
+
+    def put_region(self, x, y, rows):
+        """Sets a rectangle of pixels with upper-left corner (x,y) from
+        a list of equally long rows of colors, given either as color
+        strings or as (r,g,b) tuples, in a single PhotoImage put."""
+        height = len(rows)
+        width = height and len(rows[0])
+        # color names are those of Tk, as for setPixel, except headless
+        lookup = _rgb if isinstance(self.img, _NullPhoto) else _tkRGB
+        data = bytearray()
+        for row in rows:
+            if len(row) != width:
+                raise GraphicsError("put_region rows must be equally long")
+            if row and isinstance(row[0], str):
+                # fast path for rows of "#rrggbb" strings
+                try:
+                    packed = bytes.fromhex("".join(row).replace("#", ""))
+                except ValueError:
+                    packed = b""
+                if len(packed) == 3 * len(row):
+                    data.extend(packed)
+                    continue
+            for color in row:
+                if isinstance(color, str):
+                    color = lookup(color)
+                data.extend(color)
+        self._putRGB(x, y, width, height, bytes(data))
+
+    def to_array(self):
+        """Returns the image as a NumPy uint8 array of shape
+        (height, width, 3). Requires NumPy."""
+        if numpy is None:
+            raise GraphicsError("NumPy is not available")
+        width, height = self.getWidth(), self.getHeight()
+        data = self._getRGB(0, 0, width, height)
+        return numpy.frombuffer(data, numpy.uint8).reshape(height, width, 3)
+
+    def from_array(self, array, x=0, y=0):
+        """Sets pixels from an array-like of shape (height, width, 3)
+        with values in range(256), placing its upper-left corner at
+        (x,y). Requires NumPy."""
+        if numpy is None:
+            raise GraphicsError("NumPy is not available")
+        array = numpy.asarray(array, numpy.uint8)
+        height, width = array.shape[:2]
+        self._putRGB(x, y, width, height, array.tobytes())
+
+    def _getRGB(self, x, y, width, height):
+        # Raw RGB bytes, row by row, of a rectangle of the image
+        img = self.img
+        if isinstance(img, _NullPhoto):
+            return img.getRGB(x, y, width, height)
+        splitlist = img.tk.splitlist
+        data = img.tk.call(img.name, "data", "-from",
+                           x, y, x + width, y + height)
+        hexdigits = "".join(color[1:] for row in splitlist(data)
+                            for color in splitlist(row))
+        return bytes.fromhex(hexdigits)
+
+    def _putRGB(self, x, y, width, height, data):
+        # Write raw RGB bytes to a rectangle of the image as a binary
+        #   PPM, which Tk decodes without parsing a color per pixel
+        self._own()
+        img = self.img
+        if isinstance(img, _NullPhoto):
+            img.putRGB(x, y, width, height, data)
+            return
+        ppm = b"P6\n%d %d\n255\n" % (width, height) + data
+        img.tk.call(img.name, "put", ppm, "-format", "ppm", "-to", x, y)
 
     def save(self, filename):
         """Saves the pixmap image to filename.
@@ -955,11 +2020,2219 @@ class Image(GraphicsObject):
         ext = name.split(".")[-1]
         self.img.write( filename, format=ext)
 
-        
+
+class Group:
+
+    """A collection of objects that share a canvas tag, so that
+    recoloring, moving or hiding all of them takes one canvas call per
+    window rather than one per object:
+
+        lines = Group(*[Line(...) for i in range(40)])
+        lines.draw(win)
+        lines.setOutline("red")  # a single itemconfig on the tag
+
+    Members keep their own configuration up to date and may still be
+    changed one at a time. Use override to give a member its own color
+    or width that later group-wide changes leave alone."""
+
+    _count = 0
+
+    def __init__(self, *objects):
+        Group._count = Group._count + 1
+        self.tag = "group%d" % Group._count
+        self.members = []
+        self.hidden = False
+        # {(method, option): members} for setFill, setOutline and
+        #   setWidth. The members of each entry also carry the subtag
+        #   "<tag>.<method>.<option>" for it.
+        self._targets = {}
+        for obj in objects:
+            self.add(obj)
+
+    def __repr__(self):
+        return "Group({} objects)".format(len(self.members))
+
+    def _subtag(self, method, option):
+        return "{}.{}.{}".format(self.tag, method, option)
+
+    def add(self, obj):
+        """Add obj to the group, tagging it at once if it is drawn"""
+        if obj in self.members:
+            return
+        config = obj.config
+        tags = [self.tag]
+        for method, option in (("fill", obj._fillOption),
+                               ("outline", obj._outlineOption),
+                               ("width", "width")):
+            if option in config:
+                self._targets.setdefault((method, option), []).append(obj)
+                tags.append(self._subtag(method, option))
+        self.members.append(obj)
+        self._retag(obj, obj.tags + tuple(tags))
+
+    def remove(self, obj):
+        """Take obj out of the group"""
+        self.members.remove(obj)
+        for members in self._targets.values():
+            if obj in members:
+                members.remove(obj)
+        prefix = self.tag + "."
+        self._retag(obj, tuple(t for t in obj.tags
+                               if t != self.tag and not t.startswith(prefix)))
+
+    def override(self, obj, fill=None, outline=None, width=None):
+        """Give member obj its own fill, outline and/or width, which
+        group-wide setFill, setOutline and setWidth no longer change"""
+        tags = obj.tags
+        for method, setting, option, setter in (
+                ("fill", fill, obj._fillOption, obj.setFill),
+                ("outline", outline, obj._outlineOption, obj.setOutline),
+                ("width", width, "width", obj.setWidth)):
+            if setting is None:
+                continue
+            members = self._targets.get((method, option), [])
+            if obj in members:
+                members.remove(obj)
+                subtag = self._subtag(method, option)
+                tags = tuple(t for t in tags if t != subtag)
+            setter(setting)
+        self._retag(obj, tags)
+
+    def _retag(self, obj, tags):
+        if tags == obj.tags:
+            return
+        obj.tags = tags
+        canvas = obj.canvas
+        if canvas and not canvas.isClosed():
+            canvas.itemconfig(obj.id, tags=tags)
+
+    def _canvases(self):
+        # The open windows that members are drawn in
+        canvases = []
+        for obj in self.members:
+            canvas = obj.canvas
+            if canvas and canvas not in canvases and not canvas.isClosed():
+                canvases.append(canvas)
+        return canvases
+
+    def _reconfig(self, method, setting):
+        # Set the option behind method on every member that has one,
+        #   with one itemconfig per window and option, and none at all
+        #   where every member already has the setting
+        changed = []
+        for (m, option), members in self._targets.items():
+            if m != method:
+                continue
+            canvases = []
+            for obj in members:
+                config = obj.config
+                if config[option] != setting:
+                    config[option] = setting
+                    canvas = obj.canvas
+                    if canvas and canvas not in canvases \
+                       and not canvas.isClosed():
+                        canvases.append(canvas)
+            for canvas in canvases:
+                canvas.itemconfig(self._subtag(method, option),
+                                  {option: setting})
+                if canvas not in changed:
+                    changed.append(canvas)
+        for canvas in changed:
+            canvas._autoflush()
+
+    def setFill(self, color):
+        """Set the interior color of every member"""
+        self._reconfig("fill", color)
+
+    def setOutline(self, color):
+        """Set the outline color of every member (the color of Lines
+        and Texts)"""
+        self._reconfig("outline", color)
+
+    def setWidth(self, width):
+        """Set the line weight of every member"""
+        self._reconfig("width", width)
+
+    def draw(self, graphwin):
+        """Draw every member that is not already drawn in graphwin,
+        with a single update"""
+        with graphwin.frame():
+            for obj in self.members:
+                if obj.canvas is not graphwin:
+                    obj.draw(graphwin)
+            if self.hidden:
+                graphwin.itemconfig(self.tag, state="hidden")
+        return self
+
+    def undraw(self):
+        """Undraw every member, deleting their items with one call per
+        window"""
+        canvases = self._canvases()
+        for canvas in canvases:
+            canvas.delete(self.tag)
+        for obj in self.members:
+            canvas = obj.canvas
+            if canvas in canvases:
+                canvas.delItem(obj)
+                if isinstance(obj, Image):
+                    Image.imageCache.pop(obj.imageId, None)
+            obj.canvas = None
+            obj.id = None
+        for canvas in canvases:
+            canvas._autoflush()
+
+    def move(self, dx, dy):
+        """Move every member dx units in x direction and dy units in y
+        direction"""
+        for obj in self.members:
+            obj._move(dx, dy)
+        for canvas in self._canvases():
+            trans = canvas.trans
+            if trans:
+                x = dx / trans.xscale
+                y = -dy / trans.yscale
+            else:
+                x = dx
+                y = dy
+            canvas.move(self.tag, x, y)
+            canvas._autoflush()
+
+    def hide(self):
+        """Hide the members without undrawing them, with one canvas
+        call per window (see GraphicsObject.hide)"""
+        self._setState(True)
+
+    def show(self):
+        """Show the members again after hide"""
+        self._setState(False)
+
+    def _setState(self, hidden):
+        # Members may have been shown or hidden one at a time since
+        if hidden == self.hidden and \
+           all(obj.hidden == hidden for obj in self.members):
+            return
+        self.hidden = hidden
+        for obj in self.members:
+            obj.hidden = hidden
+        for canvas in self._canvases():
+            canvas.itemconfig(self.tag,
+                              state="hidden" if hidden else "normal")
+            canvas._autoflush()
+
+
+class Layer(Group):
+
+    """A named group of objects at one level of a window's stacking
+    order, got with GraphWin.layer:
+
+        boxes = win.layer("boxes")
+        boxes.add(Rectangle(...))  # drawn in win, below higher layers
+        boxes.hide()               # a single itemconfig on the tag
+
+    Adding an object to a layer draws it in the layer's window, if it
+    is not drawn there already, and hides it if the layer is hidden."""
+
+    def __init__(self, win, name, z):
+        Group.__init__(self)
+        self.win = win
+        self.name = name
+        self.z = z
+
+    def __repr__(self):
+        return "Layer({!r}, {} objects)".format(self.name, len(self.members))
+
+    def _drawn(self):
+        # Whether any member is drawn in the layer's window
+        for obj in self.members:
+            if obj.canvas is self.win:
+                return True
+        return False
+
+    def add(self, obj):
+        """Add obj to the layer, drawing it in the layer's window"""
+        if obj in self.members:
+            return
+        Group.add(self, obj)
+        win = self.win
+        if win.isClosed():
+            return
+        with win.frame():
+            if self.hidden:
+                obj.hide()
+            if obj.canvas is win:
+                win.tag_raise(obj.id)
+            else:
+                obj.draw(win)
+            win._stackLayer(self, obj.id)
+
+    def draw(self, graphwin=None):
+        """Draw every member that is not drawn yet, in the layer's
+        window"""
+        win = self.win
+        if graphwin is not None and graphwin is not win:
+            raise GraphicsError("A Layer can only be drawn in its window")
+        with win.frame():
+            Group.draw(self, win)
+            win._stackLayer(self, self.tag)
+        return self
+
+
+class ItemPool:
+
+    """Keeps the canvas items of undrawn objects for reuse. Drawing an
+    object through the pool takes a hidden item of an object of the
+    same class and points it at the new object with coords and
+    itemconfig, instead of creating an item; undrawing through the pool
+    hides the item rather than deleting it:
+
+        pool = ItemPool(win)
+        label = pool.draw(Text(Point(100, 440), "START"))
+        ...
+        pool.undraw(label)
+
+    A screen that is built and taken down over and over, like a menu,
+    then creates its items the first time only. Entry and Image objects
+    cannot be pooled."""
+
+    def __init__(self, win):
+        self.win = win
+        self._free = {} # ids of hidden items by object class
+        # items created and items reused by draw
+        self.created = 0
+        self.reused = 0
+
+    def __repr__(self):
+        return "ItemPool({} free items)".format(
+            sum(len(ids) for ids in self._free.values()))
+
+    def draw(self, obj):
+        """Draw obj in the pool's window, like obj.draw(win)"""
+        if isinstance(obj, (Entry, Image)):
+            raise GraphicsError(UNSUPPORTED_METHOD)
+        free = self._free.get(type(obj))
+        win = self.win
+        if not free or win.isClosed():
+            self.created = self.created + 1
+            return obj.draw(win)
+        if obj.canvas and not obj.canvas.isClosed():
+            raise GraphicsError(OBJ_ALREADY_DRAWN)
+        self.reused = self.reused + 1
+        obj.canvas = win
+        obj.id = obj._draw(_ReusedItem(win, free.pop()), obj._drawOptions())
+        win.addItem(obj)
+        win._autoflush()
+        return obj
+
+    def undraw(self, obj):
+        """Undraw obj, keeping its item for reuse if it was drawn by the
+        pool's window"""
+        canvas = obj.canvas
+        if canvas is not self.win or canvas.isClosed():
+            obj.undraw()
+            return
+        canvas.itemconfig(obj.id, state="hidden", tags=())
+        canvas.delItem(obj)
+        self._free.setdefault(type(obj), []).append(obj.id)
+        canvas._autoflush()
+        obj.canvas = None
+        obj.id = None
+
+    def reserve(self, obj, count):
+        """Make sure the pool holds at least count items for objects of
+        obj's class, creating them now from clones of obj"""
+        free = self._free.setdefault(type(obj), [])
+        with self.win.frame():
+            while len(free) < count:
+                other = obj.clone()
+                self.created = self.created + 1
+                other.draw(self.win)
+                self.undraw(other)
+
+
+# The default options of each type of canvas item, as Tk reports them
+#   (see GraphWin._resetItem)
+_itemDefaults = {}
+
+class _ReusedItem:
+
+    # Stands in for a window in GraphicsObject._draw, turning its
+    #   create_<type> call into coords and itemconfig calls on a
+    #   hidden item of the same type, which is also raised to the top
+    #   like a new item. Options the new object does not set go back
+    #   to their defaults, whatever the item's last object set.
+
+    def __init__(self, win, id):
+        self.win = win
+        self.id = id
+
+    def __getattr__(self, name):
+        if name.startswith("create_"):
+            type = name[len("create_"):]
+            return lambda coords, options: self._reuse(type, coords, options)
+        return getattr(self.win, name)
+
+    def _reuse(self, type, coords, options):
+        win, id = self.win, self.id
+        win.coords(id, *coords)
+        win._resetItem(id, type,
+                       dict(options, state=options.get("state", "normal")))
+        win.tag_raise(id)
+        return id
+
+
+##########################################################################
+# Animation
+
+# Easing curves for GraphicsObject.animate, mapping the elapsed fraction
+# of an animation to the fraction of the change made so far
+EASINGS = {"linear": lambda t: t,
+           "in": lambda t: t * t,
+           "out": lambda t: t * (2 - t),
+           "inout": lambda t: t * t * (3 - 2 * t)}
+
+class Tween:
+
+    """Handle for a running animation, as returned by
+    GraphicsObject.animate"""
+
+    def __init__(self, obj, duration, easing, fill, outline, width, size,
+                 dx, dy):
+        if isinstance(easing, str):
+            if easing not in EASINGS:
+                raise GraphicsError(BAD_OPTION)
+            easing = EASINGS[easing]
+        self.obj = obj
+        self.canvas = obj.canvas
+        self.duration = duration
+        self.easing = easing
+        self.done = False
+        self.start = self.canvas._animationTime()
+        # (setter, kind, start, end, final) for every animated option,
+        #   where kind is "color", "int" or "float"
+        self.targets = []
+        config = obj.config
+        if fill is not None:
+            self._addColor(obj.setFill, "fill", fill)
+        if outline is not None:
+            # Line and Text have no outline; it sets their fill
+            key = "outline" if "outline" in config else "fill"
+            self._addColor(obj.setOutline, key, outline)
+        if width is not None:
+            if "width" not in config:
+                raise GraphicsError(UNSUPPORTED_METHOD)
+            self.targets.append((obj.setWidth, "float",
+                                 float(config["width"]), float(width), width))
+        if size is not None:
+            if "font" not in config:
+                raise GraphicsError(UNSUPPORTED_METHOD)
+            self.targets.append((obj.setSize, "int", config["font"][1],
+                                 size, size))
+        self.dx = dx
+        self.dy = dy
+        self.moved = (0, 0)
+
+    def _addColor(self, setter, key, color):
+        if key not in self.obj.config:
+            raise GraphicsError(UNSUPPORTED_METHOD)
+        # A color that can't be read is simply set when the animation
+        #   ends
+        lookup = _rgb if self.canvas.headless else _tkRGB
+        try:
+            start = lookup(self.obj.config[key])
+            end = lookup(color)
+        except GraphicsError:
+            start = end = None
+        self.targets.append((setter, "color", start, end, color))
+
+    def _step(self, now):
+        # Bring the object to where the animation is at time now.
+        #   Returns True once the animation has finished.
+        if self.done: return True
+        t = 1.0
+        if self.duration > 0:
+            t = min(1.0, (now - self.start) / self.duration)
+        k = self.easing(t)
+        for setter, kind, start, end, final in self.targets:
+            if t >= 1.0:
+                setter(final)
+            elif kind == "color":
+                if start is not None:
+                    setter(color_rgb(
+                        int(round(start[0] + (end[0] - start[0]) * k)),
+                        int(round(start[1] + (end[1] - start[1]) * k)),
+                        int(round(start[2] + (end[2] - start[2]) * k))))
+            elif kind == "int":
+                setter(int(round(start + (end - start) * k)))
+            else:
+                setter(start + (end - start) * k)
+        if self.dx or self.dy:
+            if t >= 1.0:
+                x, y = self.dx, self.dy
+            else:
+                x, y = self.dx * k, self.dy * k
+                # whole moves add up to exactly dx,dy
+                if isinstance(self.dx, int) and isinstance(self.dy, int):
+                    x, y = int(round(x)), int(round(y))
+            mx, my = self.moved
+            if x != mx or y != my:
+                self.obj.move(x - mx, y - my)
+                self.moved = (x, y)
+        if t >= 1.0:
+            self.done = True
+        return self.done
+
+    def isDone(self):
+        return self.done
+
+    def join(self):
+        """Wait until the animation has finished (or its window is
+        closed) and return the Tween"""
+        canvas = self.canvas
+        while not self.done:
+            canvas._waitAnimation()
+        return self
+
+    def __await__(self):
+        # "await tween" is join for coroutines; other tasks keep
+        #   running while the animation plays
+        canvas = self.canvas
+        while not self.done:
+            yield from canvas._nextAnimation().__await__()
+        return self
+
+    def cancel(self):
+        """Stop the animation, leaving the object as it is now"""
+        if not self.done:
+            self.done = True
+            if self in self.canvas._tweens:
+                self.canvas._tweens.remove(self)
+
+
+##########################################################################
+# Drawing from worker threads
+#
+# Tk may only be used from the thread that runs it. Other threads post
+# the drawing they want done to a CommandQueue, and the Tk thread
+# carries it out, all of it in one frame, ANIMATION_RATE times a second.
+
+# Number of distinct commands a CommandQueue holds before post blocks
+COMMAND_QUEUE_SIZE = 1024
+
+# Methods whose queued calls on the same object (and for setPixel, the
+# same pixel) replace each other, as only the last one would be seen
+_LAST_WINS = frozenset(["setFill", "setOutline", "setWidth", "setText",
+                        "setFace", "setSize", "setStyle", "setTextColor",
+                        "setArrow", "setBackground", "setPixel"])
+
+class CommandQueue:
+
+    """Carries drawing operations from worker threads to a window.
+
+    Create the queue in the thread running Tk; any thread can then post
+    method calls on graphics objects (or on the window itself):
+
+        queue = CommandQueue(win)
+        ...
+        queue.post(bar, "setFill", "red")   # in a worker thread
+        queue.post(bar, "move", 0, -5)
+
+    Commands are run in the order they were first posted. A command
+    that only sets something another queued command on the same object
+    also sets (see _LAST_WINS) replaces it, and queued moves of an
+    object are added together, so a fast producer costs no more per
+    frame than the number of items it changes. When maxsize commands
+    are waiting, post blocks until the next frame has taken them. A
+    command that raises an exception is reported on stderr, like an
+    exception in a Tk callback, and counted in failed; the commands
+    after it still run.
+
+    Tk windows run the queue by themselves. Headless windows do it
+    while waiting for input, or when drain is called."""
+
+    def __init__(self, win, maxsize=COMMAND_QUEUE_SIZE):
+        self.win = win
+        self.maxsize = maxsize
+        self.closed = False
+        self._pending = {} # commands keyed by what they change
+        self._serial = 0
+        self._lock = threading.Lock()
+        self._taken = threading.Condition(self._lock)
+        self._thread = threading.current_thread()
+        # posts, posts merged into a queued command, commands run and
+        #   commands that raised an exception
+        self.posted = 0
+        self.coalesced = 0
+        self.executed = 0
+        self.failed = 0
+        win._queues.append(self)
+        self._timer = win.after(1000 // ANIMATION_RATE, self._onFrame)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def post(self, obj, method, *args, timeout=None):
+        """Queue the call obj.method(*args). If the queue is full, wait
+        for it to be drained, or return False without queueing
+        anything if the keyword argument timeout (in seconds) is given
+        and runs out first. Returns True once the call is queued."""
+        key = None
+        if method == "move" or method in _LAST_WINS:
+            key = (id(obj), method)
+            if method == "setPixel":
+                key = key + tuple(args[:2])
+        if threading.current_thread() is self._thread \
+           and len(self._pending) >= self.maxsize:
+            self.drain() # waiting here could never end
+        with self._lock:
+            self.posted = self.posted + 1
+            queued = self._pending.get(key)
+            if queued is not None:
+                if method == "move":
+                    args = (queued[2][0] + args[0], queued[2][1] + args[1])
+                self._pending[key] = (obj, method, args)
+                self.coalesced = self.coalesced + 1
+                return True
+            if len(self._pending) >= self.maxsize and not self.closed:
+                deadline = None
+                if timeout is not None:
+                    deadline = time.monotonic() + timeout
+                while len(self._pending) >= self.maxsize and not self.closed:
+                    remaining = None
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.posted = self.posted - 1
+                            return False
+                    self._taken.wait(remaining)
+            if self.closed:
+                raise GraphicsError("window is closed")
+            if key is None:
+                self._serial = self._serial + 1
+                key = self._serial
+            self._pending[key] = (obj, method, args)
+            return True
+
+    def drain(self):
+        """Run all the queued commands in one frame of the window and
+        return how many there were. Only call this from the thread
+        running Tk."""
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+            self._taken.notify_all()
+        if pending and not self.win.isClosed():
+            with self.win.frame():
+                for obj, method, args in pending.values():
+                    try:
+                        getattr(obj, method)(*args)
+                    except Exception:
+                        self.failed = self.failed + 1
+                        print("Exception in CommandQueue command {!r}.{}"
+                              .format(obj, method), file=sys.stderr)
+                        traceback.print_exc()
+                    else:
+                        self.executed = self.executed + 1
+        return len(pending)
+
+    def close(self):
+        """Stop running the queue. Commands still queued are dropped and
+        threads waiting in post, or posting later, get a GraphicsError."""
+        with self._lock:
+            self.closed = True
+            self._pending = {}
+            self._taken.notify_all()
+        if self._timer is not None:
+            self.win.after_cancel(self._timer)
+            self._timer = None
+        if self in self.win._queues:
+            self.win._queues.remove(self)
+
+    def _onFrame(self):
+        self._timer = None
+        if self.closed or self.win.isClosed():
+            return
+        try:
+            self.drain()
+        finally:
+            if not self.closed and not self.win.isClosed():
+                self._timer = self.win.after(1000 // ANIMATION_RATE,
+                                             self._onFrame)
+
+
+##########################################################################
+# Fonts
+#
+# Text items use shared named fonts, one per (face, size, style), so
+# that changing the font of a Text only points its item at another
+# font instead of having Tk resolve a new font description each time.
+
+# Sizes created together the first time a face and style are used, so
+# that size pulses find their fonts ready
+FONT_PRELOAD_SIZES = range(5, 37)
+
+# Fonts keyed by (headless, face, size, style). Headless windows get
+# _NullFonts, which need no Tk root.
+_fontCache = {}
+_fontStats = {"created": 0, "lookups": 0}
+
+def _font(font, headless=False):
+    # The shared font for a (face, size, style) font description
+    _fontStats["lookups"] = _fontStats["lookups"] + 1
+    face, size, style = font
+    key = (headless, face, size, style)
+    try:
+        return _fontCache[key]
+    except KeyError:
+        pass
+    sizes = FONT_PRELOAD_SIZES if size in FONT_PRELOAD_SIZES else [size]
+    for s in sizes:
+        if (headless, face, s, style) not in _fontCache:
+            _fontCache[headless, face, s, style] = _newFont(face, s, style,
+                                                            headless)
+    return _fontCache[key]
+
+def _newFont(face, size, style, headless):
+    _fontStats["created"] = _fontStats["created"] + 1
+    weight = "bold" if "bold" in style else "normal"
+    slant = "italic" if "italic" in style else "roman"
+    if headless:
+        return _NullFont(face, size, weight, slant)
+    return tkFont.Font(root=_tkRoot(), family=face, size=size,
+                       weight=weight, slant=slant)
+
+# Number of strings remembered by each of Text.measure and Text.wrap
+TEXT_CACHE_SIZE = 512
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _measure(text, font, headless):
+    f = _font(font, headless)
+    lines = text.split("\n")
+    width = max(f.measure(line) for line in lines)
+    return width, len(lines) * f.metrics("linespace")
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _wrap(text, font, width, headless):
+    # Greedy word wrap, measuring every word once
+    f = _font(font, headless)
+    space = f.measure(" ")
+    lines = []
+    for paragraph in text.split("\n"):
+        line = []
+        lineWidth = 0
+        for word in paragraph.split():
+            wordWidth = f.measure(word)
+            if line and lineWidth + space + wordWidth > width:
+                lines.append(" ".join(line))
+                line = []
+                lineWidth = 0
+            if line:
+                lineWidth = lineWidth + space
+            line.append(word)
+            lineWidth = lineWidth + wordWidth
+        lines.append(" ".join(line))
+    return "\n".join(lines)
+
+def fontStats():
+    """Return a dictionary with the number of fonts created so far
+    ("created") and the number of times a Text or Entry font was looked
+    up in the shared font cache ("lookups")."""
+    return dict(_fontStats, cached=len(_fontCache))
+
+
+##########################################################################
+# Image files
+#
+# Images made from the same file share one decoded photo, which stays
+# in a process-wide cache until it is evicted, least recently used
+# first, to keep the cached pixels within IMAGE_CACHE_BYTES. An Image
+# sharing its photo copies it before changing any pixels (see
+# Image._own), so clones and cache hits cost no pixel memory at first.
+
+# Pixel memory the image cache may hold, counted as Tk keeps a photo:
+# four bytes per pixel
+IMAGE_CACHE_BYTES = 64 * 2**20
+
+# Photos keyed by (headless, path, modification time), least recently
+# used first
+_imageCache = OrderedDict()
+_imageStats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+
+def _loadPhoto(filename):
+    # The shared photo decoded from filename. A file changed since it
+    #   was cached is read again.
+    path = os.path.abspath(filename)
+    key = (_backend != "tk", path, os.stat(path).st_mtime_ns)
+    try:
+        photo = _imageCache[key]
+    except KeyError:
+        pass
+    else:
+        _imageCache.move_to_end(key)
+        _imageStats["hits"] = _imageStats["hits"] + 1
+        return photo
+    _imageStats["misses"] = _imageStats["misses"] + 1
+    photo = _photoImage(file=filename)
+    _imageCache[key] = photo
+    _imageStats["bytes"] = _imageStats["bytes"] + _photoBytes(photo)
+    while _imageStats["bytes"] > IMAGE_CACHE_BYTES and len(_imageCache) > 1:
+        old = _imageCache.popitem(last=False)[1]
+        _imageStats["bytes"] = _imageStats["bytes"] - _photoBytes(old)
+        _imageStats["evictions"] = _imageStats["evictions"] + 1
+    return photo
+
+def _photoBytes(photo):
+    return photo.width() * photo.height() * 4
+
+def imageStats():
+    """Return a dictionary with the number of Images made from a file
+    that found it already decoded ("hits") or had to decode it
+    ("misses"), the number of decoded files evicted from the cache
+    ("evictions"), and the number ("cached") and pixel memory ("bytes")
+    of the files it holds now."""
+    return dict(_imageStats, cached=len(_imageCache))
+
+
+##########################################################################
+# Batching
+#
+# Inside a frame, a Tk window does not send canvas changes to Tcl one
+# call at a time. They are written into a Tcl script instead, which is
+# evaluated with a single call when the frame is committed or as soon
+# as anything else is asked of Tcl, so the calls still take effect in
+# order.
+
+# Canvas subcommands that are batched. They return nothing when they
+# change something, except the queries: coords or itemconfigure with
+# fewer arguments.
+_BATCHED = {"itemconfigure": 5, "coords": 5, "move": 5, "delete": 2,
+            "raise": 3, "lower": 3, "dtag": 3, "addtag": 4}
+
+# Characters that need a backslash in a Tcl word
+_TCL_ESCAPES = {"\n": "\\n", "\t": "\\t", "\r": "\\r", " ": "\\ "}
+for _c in '[]{}$"\\;':
+    _TCL_ESCAPES[_c] = "\\" + _c
+del _c
+
+def _tclQuote(value):
+    # value as one word of a Tcl script, meaning what tkinter would
+    #   make of it when passing it as an argument
+    if isinstance(value, str):
+        if not value:
+            return "{}"
+        for c in value:
+            if c in _TCL_ESCAPES:
+                return "".join(_TCL_ESCAPES.get(c, c) for c in value)
+        return value
+    if isinstance(value, (int, float)):
+        return repr(int(value) if isinstance(value, bool) else value)
+    if isinstance(value, (tuple, list)):
+        return "{" + " ".join(_tclQuote(v) for v in value) + "}"
+    return _tclQuote(str(value))
+
+
+class _TclBatch:
+
+    """Stands in for the Tcl interpreter (the tk attribute) of a Tk
+    window, collecting the batched commands of its canvas while
+    batching is on and passing everything else straight through"""
+
+    def __init__(self, tk, widget):
+        self._tk = tk
+        self._widget = widget
+        self.batching = False
+        self.script = []
+        # batched commands and the evals that ran them
+        self.commands = 0
+        self.evals = 0
+
+    def __getattr__(self, name):
+        return getattr(self._tk, name)
+
+    def call(self, *args):
+        if len(args) == 1 and isinstance(args[0], tuple):
+            args = args[0]
+        if self.batching and args[0] == self._widget and \
+           len(args) >= _BATCHED.get(args[1], len(args) + 1):
+            self.script.append(" ".join(map(_tclQuote, args)))
+            return ""
+        if self.script:
+            self.flush()
+        return self._tk.call(*args)
+
+    def eval(self, script):
+        if self.script:
+            self.flush()
+        return self._tk.eval(script)
+
+    def flush(self):
+        # Run the collected commands as one script
+        script = self.script
+        self.script = []
+        self.commands = self.commands + len(script)
+        self.evals = self.evals + 1
+        self._tk.eval("\n".join(script))
+
+
+##########################################################################
+# Instrumentation
+#
+# An instrumented GraphWin is switched to a subclass of its own class
+# with _Instrumented mixed in ahead of it, whose canvas methods count
+# and time the calls before passing them on. Windows that are not
+# instrumented run the plain methods, without any extra checks.
+
+# Upper bounds, in milliseconds, of the frame time histogram buckets;
+# frames longer than the last bound are counted in a final bucket
+FRAME_BUCKETS = (1, 2, 4, 8, 16, 33, 66, 100, 250, 1000)
+
+_instrumentedClasses = {}
+
+def _instrumentedClass(cls):
+    if cls not in _instrumentedClasses:
+        _instrumentedClasses[cls] = type(cls.__name__, (_Instrumented, cls),
+                                         {"_plainClass": cls})
+    return _instrumentedClasses[cls]
+
+def _newStats():
+    return {"calls": {}, "updates": 0, "updateTime": 0.0, "updateMax": 0.0,
+            "frames": 0, "frameTime": 0.0, "frameMax": 0.0,
+            "histogram": [0] * (len(FRAME_BUCKETS) + 1)}
+
+def _copyStats(stats):
+    stats = dict(stats, calls=dict(stats["calls"]))
+    bounds = FRAME_BUCKETS + (float("inf"),)
+    stats["histogram"] = dict(zip(bounds, stats["histogram"]))
+    return stats
+
+def _diffStats(after, before):
+    # The stats of the interval between two stats() results. The
+    #   maxima can't be separated, so they are those of after.
+    diff = dict(after)
+    diff["calls"] = dict((op, n - before["calls"].get(op, 0))
+                         for op, n in after["calls"].items()
+                         if n != before["calls"].get(op, 0))
+    for key in ("updates", "updateTime", "frames", "frameTime"):
+        diff[key] = after[key] - before[key]
+    diff["histogram"] = dict((bound, n - before["histogram"][bound])
+                             for bound, n in after["histogram"].items())
+    return diff
+
+
+class _Instrumented:
+
+    """Mixin counting and timing the canvas calls of a GraphWin"""
+
+    instrumented = True
+
+    def _count(self, op):
+        calls = self._stats["calls"]
+        calls[op] = calls.get(op, 0) + 1
+
+    def create_line(self, *args, **kw):
+        self._count("create")
+        return super().create_line(*args, **kw)
+
+    def create_rectangle(self, *args, **kw):
+        self._count("create")
+        return super().create_rectangle(*args, **kw)
+
+    def create_oval(self, *args, **kw):
+        self._count("create")
+        return super().create_oval(*args, **kw)
+
+    def create_polygon(self, *args, **kw):
+        self._count("create")
+        return super().create_polygon(*args, **kw)
+
+    def create_text(self, *args, **kw):
+        self._count("create")
+        return super().create_text(*args, **kw)
+
+    def create_image(self, *args, **kw):
+        self._count("create")
+        return super().create_image(*args, **kw)
+
+    def create_window(self, *args, **kw):
+        self._count("create")
+        return super().create_window(*args, **kw)
+
+    def itemconfig(self, tagOrId, cnf=None, **kw):
+        self._count("itemconfig")
+        return super().itemconfig(tagOrId, cnf, **kw)
+
+    itemconfigure = itemconfig
+
+    def coords(self, *args):
+        self._count("coords")
+        return super().coords(*args)
+
+    def move(self, *args):
+        self._count("move")
+        return super().move(*args)
+
+    def delete(self, *args):
+        self._count("delete")
+        return super().delete(*args)
+
+    def tag_raise(self, *args):
+        self._count("restack")
+        return super().tag_raise(*args)
+
+    def tag_lower(self, *args):
+        self._count("restack")
+        return super().tag_lower(*args)
+
+    def config(self, cnf=None, **kw):
+        self._count("config")
+        return super().config(cnf, **kw)
+
+    configure = config
+
+    def update(self):
+        self._timeUpdate(super().update)
+
+    def update_idletasks(self):
+        self._timeUpdate(super().update_idletasks)
+
+    def _timeUpdate(self, update):
+        self._count("update")
+        start = time.perf_counter()
+        update()
+        elapsed = time.perf_counter() - start
+        stats = self._stats
+        stats["updates"] = stats["updates"] + 1
+        stats["updateTime"] = stats["updateTime"] + elapsed
+        if elapsed > stats["updateMax"]:
+            stats["updateMax"] = elapsed
+
+    def begin_frame(self):
+        if self._frameDepth == 0:
+            self._frameStart = time.perf_counter()
+        super().begin_frame()
+
+    def commit_frame(self):
+        super().commit_frame()
+        if self._frameDepth == 0 and hasattr(self, "_frameStart"):
+            elapsed = time.perf_counter() - self._frameStart
+            del self._frameStart
+            stats = self._stats
+            stats["frames"] = stats["frames"] + 1
+            stats["frameTime"] = stats["frameTime"] + elapsed
+            if elapsed > stats["frameMax"]:
+                stats["frameMax"] = elapsed
+            ms = elapsed * 1000
+            bucket = 0
+            while bucket < len(FRAME_BUCKETS) and ms > FRAME_BUCKETS[bucket]:
+                bucket = bucket + 1
+            stats["histogram"][bucket] = stats["histogram"][bucket] + 1
+
+
+##########################################################################
+# Headless backends
+#
+# With the "null" and "record" backends a GraphWin is an instance of a
+# subclass of the requested window class with _NullCanvas mixed in
+# ahead of tk.Canvas. _NullCanvas implements the part of the Tk canvas
+# interface used by this module on plain dictionaries, so the rest of
+# GraphWin and all GraphicsObjects work unchanged without a display.
+
+_headlessClasses = {}
+
+def _headlessClass(cls, backend):
+    key = (cls, backend)
+    if key not in _headlessClasses:
+        base = {"record": _RecordCanvas,
+                "raster": _RasterCanvas}.get(backend, _NullCanvas)
+        _headlessClasses[key] = type(cls.__name__, (base, cls), {})
+    return _headlessClasses[key]
+
+
+class _NullMaster:
+
+    """Stand-in for the Toplevel of a headless window"""
+
+    def __init__(self, title):
+        self._title = title
+        self.destroyed = False
+
+    def title(self, title=None):
+        if title is None:
+            return self._title
+        self._title = title
+
+    def destroy(self):
+        self.destroyed = True
+
+    def protocol(self, name, func): pass
+    def resizable(self, width, height): pass
+    def lift(self): pass
+
+
+class _NullCanvas:
+
+    """In-memory canvas for headless windows. Items are kept in
+    self.scene as {id: {"type", "coords", "options"}}. Methods taking
+    an item id also accept a tag, as in Tk; an item's tags are kept as
+    a tuple in its "tags" option."""
+
+    headless = True
+
+    def _open(self, title, width, height):
+        self.master = _NullMaster(title)
+        self.options = {"width": int(width), "height": int(height),
+                        "bg": "#d9d9d9"}
+        self.scene = {}
+        self._nextId = 1
+        self._animVar = _NullVar()
+        self._clock = 0.0
+
+    def _log(self, *op):
+        pass # overridden by the record backend
+
+    # Headless animations run on a virtual clock that only advances
+    #   while something waits for them, so they finish at full speed.
+    def _animationTime(self):
+        return self._clock
+
+    def _resetItem(self, id, type, options):
+        self.scene[id]["options"] = {}
+        self.itemconfig(id, options)
+
+    def _waitAnimation(self):
+        self._clock = self._clock + 1.0 / ANIMATION_RATE
+        self._tick()
+
+    def after(self, ms, func=None, *args):
+        return None # timers never fire; see _waitAnimation
+
+    def after_cancel(self, id):
+        pass
+
+    def _waitInput(self, deadline=None):
+        # Deliver the next scripted event instead of waiting for one.
+        #   Time does not pass headless, so with no input left a wait
+        #   with a deadline times out at once. Running animations are
+        #   finished first, as they would be while a user decides, and
+        #   commands queued by other threads are run.
+        while self._tweens:
+            self._waitAnimation()
+        for queue in list(self._queues):
+            queue.drain()
+        if not _scriptedInput:
+            if deadline is not None:
+                return False
+            raise GraphicsError("no scripted input left")
+        event = _scriptedInput.popleft()
+        e = tk.Event()
+        if event[0] == "mouse":
+            e.x, e.y = event[1], event[2]
+            self._onClick(e)
+        else:
+            e.keysym = event[1]
+            self._onKey(e)
+        return True
+
+    def _wakeInput(self):
+        pass
+
+    # The async waits do the same, giving other tasks a turn each time
+    async def _nextInput(self):
+        self._waitInput()
+        await asyncio.sleep(0)
+
+    async def _nextAnimation(self):
+        self._waitAnimation()
+        await asyncio.sleep(0)
+
+    def _create(self, kind, args, kw):
+        # Accepts the same argument forms as the Tk create methods:
+        #   coordinates given separately or as lists, options as a
+        #   trailing dictionary and/or keywords
+        coords = []
+        options = {}
+        for arg in args:
+            if isinstance(arg, dict):
+                options.update(arg)
+            elif isinstance(arg, (list, tuple)):
+                coords.extend(arg)
+            else:
+                coords.append(arg)
+        options.update(kw)
+        if "tags" in options:
+            options["tags"] = _tagTuple(options["tags"])
+        id = self._nextId
+        self._nextId = id + 1
+        self.scene[id] = {"type": kind, "coords": coords, "options": options}
+        self._log("create", kind, id, tuple(coords), dict(options))
+        return id
+
+    def create_line(self, *args, **kw):
+        return self._create("line", args, kw)
+
+    def create_rectangle(self, *args, **kw):
+        return self._create("rectangle", args, kw)
+
+    def create_oval(self, *args, **kw):
+        return self._create("oval", args, kw)
+
+    def create_polygon(self, *args, **kw):
+        return self._create("polygon", args, kw)
+
+    def create_text(self, *args, **kw):
+        return self._create("text", args, kw)
+
+    def create_image(self, *args, **kw):
+        return self._create("image", args, kw)
+
+    def create_window(self, *args, **kw):
+        return self._create("window", args, kw)
+
+    def _find(self, tagOrId):
+        # Ids of the items with the given id or tag, bottom first
+        scene = self.scene
+        if tagOrId in scene:
+            return [tagOrId]
+        if tagOrId == "all":
+            return list(scene)
+        return [id for id, item in scene.items()
+                if tagOrId in item["options"].get("tags", ())]
+
+    def find_withtag(self, tagOrId):
+        return tuple(self._find(tagOrId))
+
+    def gettags(self, tagOrId):
+        ids = self._find(tagOrId)
+        if not ids:
+            return ()
+        return self.scene[ids[0]]["options"].get("tags", ())
+
+    def addtag_withtag(self, newtag, tagOrId):
+        for id in self._find(tagOrId):
+            options = self.scene[id]["options"]
+            tags = options.get("tags", ())
+            if newtag not in tags:
+                options["tags"] = tags + (newtag,)
+        self._log("addtag", newtag, tagOrId)
+
+    def dtag(self, tagOrId, tagToDelete=None):
+        if tagToDelete is None:
+            tagToDelete = tagOrId
+        for id in self._find(tagOrId):
+            options = self.scene[id]["options"]
+            options["tags"] = tuple(t for t in options.get("tags", ())
+                                    if t != tagToDelete)
+        self._log("dtag", tagOrId, tagToDelete)
+
+    def itemconfig(self, tagOrId, cnf=None, **kw):
+        options = dict(cnf or {}, **kw)
+        if "tags" in options:
+            options["tags"] = _tagTuple(options["tags"])
+        for id in self._find(tagOrId):
+            self.scene[id]["options"].update(options)
+        self._log("itemconfig", tagOrId, options)
+
+    itemconfigure = itemconfig
+
+    def itemcget(self, tagOrId, option):
+        return self.scene[self._find(tagOrId)[0]]["options"].get(option, "")
+
+    def coords(self, tagOrId, *args):
+        ids = self._find(tagOrId)
+        if not args:
+            return list(self.scene[ids[0]]["coords"]) if ids else []
+        coords = []
+        for arg in args:
+            if isinstance(arg, (list, tuple)):
+                coords.extend(arg)
+            else:
+                coords.append(arg)
+        if ids:
+            self.scene[ids[0]]["coords"] = coords
+        self._log("coords", tagOrId, tuple(coords))
+
+    def move(self, tagOrId, dx, dy):
+        for id in self._find(tagOrId):
+            coords = self.scene[id]["coords"]
+            for i in range(0, len(coords), 2):
+                coords[i] = coords[i] + dx
+                coords[i+1] = coords[i+1] + dy
+        self._log("move", tagOrId, dx, dy)
+
+    def delete(self, *tagsOrIds):
+        for tagOrId in tagsOrIds:
+            for id in self._find(tagOrId):
+                del self.scene[id]
+            self._log("delete", tagOrId)
+
+    # self.scene is kept in stacking order, bottom first
+    def tag_lower(self, tagOrId, belowThis=None):
+        self._restack(tagOrId, belowThis, False)
+        self._log("tag_lower", tagOrId, belowThis)
+
+    def tag_raise(self, tagOrId, aboveThis=None):
+        self._restack(tagOrId, aboveThis, True)
+        self._log("tag_raise", tagOrId, aboveThis)
+
+    def _restack(self, tagOrId, ref, above):
+        # Move the matching items, keeping their order, just above the
+        #   topmost or below the lowest item matching ref, or to the
+        #   top or bottom of the display list
+        ids = self._find(tagOrId)
+        if not ids:
+            return
+        if ref is None and above:
+            for id in ids: # dicts keep insertion order
+                self.scene[id] = self.scene.pop(id)
+            return
+        moved = [(id, self.scene.pop(id)) for id in ids]
+        refs = [] if ref is None else self._find(ref)
+        order = list(self.scene.items())
+        if not refs:
+            pos = len(order) if above else 0
+        elif above:
+            pos = list(self.scene).index(refs[-1]) + 1
+        else:
+            pos = list(self.scene).index(refs[0])
+        order[pos:pos] = moved
+        self.scene = dict(order)
+
+    def config(self, cnf=None, **kw):
+        options = dict(cnf or {}, **kw)
+        self.options.update(options)
+        self._log("config", options)
+
+    configure = config
+
+    def update(self):
+        self._log("update")
+
+    def update_idletasks(self):
+        self._log("update_idletasks")
+
+    # Input only ever comes from the scripted queue
+    def bind(self, sequence=None, func=None, add=None): pass
+    def bind_all(self, sequence=None, func=None, add=None): pass
+    def unbind(self, sequence, funcid=None): pass
+
+
+class _RecordCanvas(_NullCanvas):
+
+    """Headless canvas that also keeps the ordered list of canvas
+    operations performed on it in self.ops"""
+
+    def _open(self, title, width, height):
+        self.ops = []
+        _NullCanvas._open(self, title, width, height)
+
+    def _log(self, *op):
+        self.ops.append(op)
+
+
+class _NullFont:
+
+    """Stand-in for tkinter.font.Font used by headless windows. There
+    are no real glyphs, so metrics are estimates for a 96 dpi screen:
+    every character is 0.6 em wide and a line is 1.2 em high."""
+
+    fonts = {} # every _NullFont by name
+
+    def __init__(self, family, size, weight, slant):
+        self.name = "font%d" % (len(_NullFont.fonts) + 1)
+        _NullFont.fonts[self.name] = self
+        self.options = {"family": family, "size": size,
+                        "weight": weight, "slant": slant}
+
+    def actual(self, option=None):
+        if option is None:
+            return dict(self.options)
+        return self.options[option]
+
+    def _em(self):
+        # sizes are in points (1/72 inch) unless negative, in pixels
+        size = self.options["size"]
+        return -size if size < 0 else size * 96 / 72.0
+
+    def measure(self, text):
+        return int(round(len(text) * 0.6 * self._em()))
+
+    def metrics(self, *options):
+        em = self._em()
+        metrics = {"ascent": int(round(em * 0.9)),
+                   "descent": int(round(em * 0.3)),
+                   "linespace": int(round(em * 1.2)), "fixed": 1}
+        if len(options) == 1:
+            return metrics[options[0]]
+        return metrics
+
+
+class _NullVar:
+
+    """Stand-in for tk.StringVar used by headless Entry objects"""
+
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class _NullPhoto:
+
+    """In-memory stand-in for tk.PhotoImage. Images loaded from a file
+    only take their size from it; unset pixels read back as black."""
+
+    def __init__(self, file=None, width=0, height=0):
+        if file is not None:
+            width, height = _imageFileSize(file)
+        self._width = int(width)
+        self._height = int(height)
+        self.pixels = {}
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def get(self, x, y):
+        return self.pixels.get((x, y), (0, 0, 0))
+
+    def put(self, data, to=(0, 0)):
+        x0, y0 = to[0], to[1]
+        pixels = self.pixels
+        for dy, row in enumerate(_photoRows(data)):
+            for dx, color in enumerate(row):
+                pixels[x0+dx, y0+dy] = _rgb(color)
+
+    def getRGB(self, x, y, width, height):
+        data = bytearray()
+        get = self.get
+        for j in range(y, y + height):
+            for i in range(x, x + width):
+                data.extend(get(i, j))
+        return bytes(data)
+
+    def putRGB(self, x, y, width, height, data):
+        pixels = self.pixels
+        k = 0
+        for j in range(y, y + height):
+            for i in range(x, x + width):
+                pixels[i, j] = tuple(data[k:k+3])
+                k = k + 3
+
+    def copy(self):
+        other = _NullPhoto(width=self._width, height=self._height)
+        other.pixels = self.pixels.copy()
+        return other
+
+    def write(self, filename, format=None):
+        if format != "ppm":
+            raise GraphicsError(UNSUPPORTED_METHOD)
+        data = bytearray()
+        for y in range(self._height):
+            for x in range(self._width):
+                data.extend(self.get(x, y))
+        with open(filename, "wb") as f:
+            f.write(b"P6\n%d %d\n255\n" % (self._width, self._height))
+            f.write(data)
+
+
+def _stringVar():
+    if _backend == "tk":
+        return tk.StringVar(_tkRoot())
+    return _NullVar()
+
+def _photoImage(**options):
+    if _backend == "tk":
+        return tk.PhotoImage(master=_tkRoot(), **options)
+    return _NullPhoto(**options)
+
+def _photoRows(data):
+    # Split PhotoImage put data ("{c c ...} {c c ...}" or a sequence of
+    #   rows of colors) into rows of color strings
+    if not isinstance(data, str):
+        return [list(row) for row in data]
+    if "{" not in data:
+        return [data.split()]
+    return [row.split() for row in data.replace("}", "").split("{")
+            if row.strip()]
+
+def _tagTuple(tags):
+    # Canvas tags, given as a string of words or a sequence, as a tuple
+    if isinstance(tags, str):
+        return tuple(tags.split())
+    return tuple(tags)
+
+def _imageFileSize(filename):
+    # Width and height of a PNG, GIF or PPM/PGM file
+    with open(filename, "rb") as f:
+        head = f.read(64)
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return (int.from_bytes(head[16:20], "big"),
+                int.from_bytes(head[20:24], "big"))
+    if head[:4] == b"GIF8":
+        return (int.from_bytes(head[6:8], "little"),
+                int.from_bytes(head[8:10], "little"))
+    if head[:1] == b"P" and head[1:2] in b"2356":
+        fields = b" ".join(line.split(b"#")[0] for line in head.splitlines())
+        fields = fields.split()
+        return int(fields[1]), int(fields[2])
+    raise GraphicsError("couldn't recognize data in image file")
+
+def _rgb(color):
+    # (r,g,b) for a color as Tk reads it: "#rgb", "#rrggbb", "#rrrgggbbb",
+    #   "#rrrrggggbbbb" or a color name, in any case and with or
+    #   without spaces
+    if color.startswith("#"):
+        digits = color[1:]
+        n = len(digits) // 3
+        if 1 <= n <= 4 and len(digits) == 3 * n:
+            try:
+                return tuple(int((digits[i:i+n] * 2)[:2], 16)
+                             for i in range(0, 3 * n, n))
+            except ValueError:
+                pass
+        raise GraphicsError(BAD_OPTION)
+    if not _COLOR_NAMES:
+        names = _X11_COLORS.split()
+        for i in range(0, len(names), 2):
+            _COLOR_NAMES[names[i]] = tuple(bytes.fromhex(names[i+1]))
+        _COLOR_NAMES.update(_WEB_COLORS)
+    name = color.replace(" ", "").lower()
+    rgb = _COLOR_NAMES.get(name)
+    if rgb is None:
+        if name[:4] in ("gray", "grey") and name[4:].isdigit() \
+           and int(name[4:]) <= 100:
+            return (int(int(name[4:]) * 2.55 + 0.5),) * 3
+        raise GraphicsError(BAD_OPTION)
+    return rgb
+
+def _tkRGB(color):
+    # (r,g,b) for any color Tk knows, looked up once per color
+    rgb = _tkColors.get(color)
+    if rgb is None:
+        try:
+            rgb = tuple(c >> 8 for c in _tkRoot().winfo_rgb(color))
+        except tk.TclError:
+            raise GraphicsError(BAD_OPTION)
+        _tkColors[color] = rgb
+    return rgb
+
+_tkColors = {}
+
+# The color names known to Tk on X11, which _rgb reads into
+# _COLOR_NAMES when first needed, besides gray0-gray100 (and grey0-
+# grey100). Tk itself gives the names in _WEB_COLORS their web
+# colors on every platform.
+_COLOR_NAMES = {}
+_WEB_COLORS = {"gray": (128, 128, 128), "grey": (128, 128, 128),
+               "green": (0, 128, 0), "maroon": (128, 0, 0),
+               "purple": (128, 0, 128)}
+_X11_COLORS = (
+    "snow fffafa ghostwhite f8f8ff whitesmoke f5f5f5 gainsboro dcdcdc "
+    "floralwhite fffaf0 oldlace fdf5e6 linen faf0e6 antiquewhite faebd7 "
+    "papayawhip ffefd5 blanchedalmond ffebcd bisque ffe4c4 "
+    "peachpuff ffdab9 navajowhite ffdead moccasin ffe4b5 cornsilk fff8dc "
+    "ivory fffff0 lemonchiffon fffacd seashell fff5ee honeydew f0fff0 "
+    "mintcream f5fffa azure f0ffff aliceblue f0f8ff lavender e6e6fa "
+    "lavenderblush fff0f5 mistyrose ffe4e1 white ffffff black 000000 "
+    "darkslategray 2f4f4f darkslategrey 2f4f4f dimgray 696969 "
+    "dimgrey 696969 slategray 708090 slategrey 708090 "
+    "lightslategray 778899 lightslategrey 778899 gray bebebe grey bebebe "
+    "lightgrey d3d3d3 lightgray d3d3d3 midnightblue 191970 navy 000080 "
+    "navyblue 000080 cornflowerblue 6495ed darkslateblue 483d8b "
+    "slateblue 6a5acd mediumslateblue 7b68ee lightslateblue 8470ff "
+    "mediumblue 0000cd royalblue 4169e1 blue 0000ff dodgerblue 1e90ff "
+    "deepskyblue 00bfff skyblue 87ceeb lightskyblue 87cefa "
+    "steelblue 4682b4 lightsteelblue b0c4de lightblue add8e6 "
+    "powderblue b0e0e6 paleturquoise afeeee darkturquoise 00ced1 "
+    "mediumturquoise 48d1cc turquoise 40e0d0 cyan 00ffff lightcyan e0ffff "
+    "cadetblue 5f9ea0 mediumaquamarine 66cdaa aquamarine 7fffd4 "
+    "darkgreen 006400 darkolivegreen 556b2f darkseagreen 8fbc8f "
+    "seagreen 2e8b57 mediumseagreen 3cb371 lightseagreen 20b2aa "
+    "palegreen 98fb98 springgreen 00ff7f lawngreen 7cfc00 green 00ff00 "
+    "chartreuse 7fff00 mediumspringgreen 00fa9a greenyellow adff2f "
+    "limegreen 32cd32 yellowgreen 9acd32 forestgreen 228b22 "
+    "olivedrab 6b8e23 darkkhaki bdb76b khaki f0e68c palegoldenrod eee8aa "
+    "lightgoldenrodyellow fafad2 lightyellow ffffe0 yellow ffff00 "
+    "gold ffd700 lightgoldenrod eedd82 goldenrod daa520 "
+    "darkgoldenrod b8860b rosybrown bc8f8f indianred cd5c5c "
+    "saddlebrown 8b4513 sienna a0522d peru cd853f burlywood deb887 "
+    "beige f5f5dc wheat f5deb3 sandybrown f4a460 tan d2b48c "
+    "chocolate d2691e firebrick b22222 brown a52a2a darksalmon e9967a "
+    "salmon fa8072 lightsalmon ffa07a orange ffa500 darkorange ff8c00 "
+    "coral ff7f50 lightcoral f08080 tomato ff6347 orangered ff4500 "
+    "red ff0000 hotpink ff69b4 deeppink ff1493 pink ffc0cb "
+    "lightpink ffb6c1 palevioletred db7093 maroon b03060 "
+    "mediumvioletred c71585 violetred d02090 magenta ff00ff violet ee82ee "
+    "plum dda0dd orchid da70d6 mediumorchid ba55d3 darkorchid 9932cc "
+    "darkviolet 9400d3 blueviolet 8a2be2 purple a020f0 mediumpurple 9370db "
+    "thistle d8bfd8 snow1 fffafa snow2 eee9e9 snow3 cdc9c9 snow4 8b8989 "
+    "seashell1 fff5ee seashell2 eee5de seashell3 cdc5bf seashell4 8b8682 "
+    "antiquewhite1 ffefdb antiquewhite2 eedfcc antiquewhite3 cdc0b0 "
+    "antiquewhite4 8b8378 bisque1 ffe4c4 bisque2 eed5b7 bisque3 cdb79e "
+    "bisque4 8b7d6b peachpuff1 ffdab9 peachpuff2 eecbad peachpuff3 cdaf95 "
+    "peachpuff4 8b7765 navajowhite1 ffdead navajowhite2 eecfa1 "
+    "navajowhite3 cdb38b navajowhite4 8b795e lemonchiffon1 fffacd "
+    "lemonchiffon2 eee9bf lemonchiffon3 cdc9a5 lemonchiffon4 8b8970 "
+    "cornsilk1 fff8dc cornsilk2 eee8cd cornsilk3 cdc8b1 cornsilk4 8b8878 "
+    "ivory1 fffff0 ivory2 eeeee0 ivory3 cdcdc1 ivory4 8b8b83 "
+    "honeydew1 f0fff0 honeydew2 e0eee0 honeydew3 c1cdc1 honeydew4 838b83 "
+    "lavenderblush1 fff0f5 lavenderblush2 eee0e5 lavenderblush3 cdc1c5 "
+    "lavenderblush4 8b8386 mistyrose1 ffe4e1 mistyrose2 eed5d2 "
+    "mistyrose3 cdb7b5 mistyrose4 8b7d7b azure1 f0ffff azure2 e0eeee "
+    "azure3 c1cdcd azure4 838b8b slateblue1 836fff slateblue2 7a67ee "
+    "slateblue3 6959cd slateblue4 473c8b royalblue1 4876ff "
+    "royalblue2 436eee royalblue3 3a5fcd royalblue4 27408b blue1 0000ff "
+    "blue2 0000ee blue3 0000cd blue4 00008b dodgerblue1 1e90ff "
+    "dodgerblue2 1c86ee dodgerblue3 1874cd dodgerblue4 104e8b "
+    "steelblue1 63b8ff steelblue2 5cacee steelblue3 4f94cd "
+    "steelblue4 36648b deepskyblue1 00bfff deepskyblue2 00b2ee "
+    "deepskyblue3 009acd deepskyblue4 00688b skyblue1 87ceff "
+    "skyblue2 7ec0ee skyblue3 6ca6cd skyblue4 4a708b lightskyblue1 b0e2ff "
+    "lightskyblue2 a4d3ee lightskyblue3 8db6cd lightskyblue4 607b8b "
+    "slategray1 c6e2ff slategray2 b9d3ee slategray3 9fb6cd "
+    "slategray4 6c7b8b lightsteelblue1 cae1ff lightsteelblue2 bcd2ee "
+    "lightsteelblue3 a2b5cd lightsteelblue4 6e7b8b lightblue1 bfefff "
+    "lightblue2 b2dfee lightblue3 9ac0cd lightblue4 68838b "
+    "lightcyan1 e0ffff lightcyan2 d1eeee lightcyan3 b4cdcd "
+    "lightcyan4 7a8b8b paleturquoise1 bbffff paleturquoise2 aeeeee "
+    "paleturquoise3 96cdcd paleturquoise4 668b8b cadetblue1 98f5ff "
+    "cadetblue2 8ee5ee cadetblue3 7ac5cd cadetblue4 53868b "
+    "turquoise1 00f5ff turquoise2 00e5ee turquoise3 00c5cd "
+    "turquoise4 00868b cyan1 00ffff cyan2 00eeee cyan3 00cdcd cyan4 008b8b "
+    "darkslategray1 97ffff darkslategray2 8deeee darkslategray3 79cdcd "
+    "darkslategray4 528b8b aquamarine1 7fffd4 aquamarine2 76eec6 "
+    "aquamarine3 66cdaa aquamarine4 458b74 darkseagreen1 c1ffc1 "
+    "darkseagreen2 b4eeb4 darkseagreen3 9bcd9b darkseagreen4 698b69 "
+    "seagreen1 54ff9f seagreen2 4eee94 seagreen3 43cd80 seagreen4 2e8b57 "
+    "palegreen1 9aff9a palegreen2 90ee90 palegreen3 7ccd7c "
+    "palegreen4 548b54 springgreen1 00ff7f springgreen2 00ee76 "
+    "springgreen3 00cd66 springgreen4 008b45 green1 00ff00 green2 00ee00 "
+    "green3 00cd00 green4 008b00 chartreuse1 7fff00 chartreuse2 76ee00 "
+    "chartreuse3 66cd00 chartreuse4 458b00 olivedrab1 c0ff3e "
+    "olivedrab2 b3ee3a olivedrab3 9acd32 olivedrab4 698b22 "
+    "darkolivegreen1 caff70 darkolivegreen2 bcee68 darkolivegreen3 a2cd5a "
+    "darkolivegreen4 6e8b3d khaki1 fff68f khaki2 eee685 khaki3 cdc673 "
+    "khaki4 8b864e lightgoldenrod1 ffec8b lightgoldenrod2 eedc82 "
+    "lightgoldenrod3 cdbe70 lightgoldenrod4 8b814c lightyellow1 ffffe0 "
+    "lightyellow2 eeeed1 lightyellow3 cdcdb4 lightyellow4 8b8b7a "
+    "yellow1 ffff00 yellow2 eeee00 yellow3 cdcd00 yellow4 8b8b00 "
+    "gold1 ffd700 gold2 eec900 gold3 cdad00 gold4 8b7500 goldenrod1 ffc125 "
+    "goldenrod2 eeb422 goldenrod3 cd9b1d goldenrod4 8b6914 "
+    "darkgoldenrod1 ffb90f darkgoldenrod2 eead0e darkgoldenrod3 cd950c "
+    "darkgoldenrod4 8b6508 rosybrown1 ffc1c1 rosybrown2 eeb4b4 "
+    "rosybrown3 cd9b9b rosybrown4 8b6969 indianred1 ff6a6a "
+    "indianred2 ee6363 indianred3 cd5555 indianred4 8b3a3a sienna1 ff8247 "
+    "sienna2 ee7942 sienna3 cd6839 sienna4 8b4726 burlywood1 ffd39b "
+    "burlywood2 eec591 burlywood3 cdaa7d burlywood4 8b7355 wheat1 ffe7ba "
+    "wheat2 eed8ae wheat3 cdba96 wheat4 8b7e66 tan1 ffa54f tan2 ee9a49 "
+    "tan3 cd853f tan4 8b5a2b chocolate1 ff7f24 chocolate2 ee7621 "
+    "chocolate3 cd661d chocolate4 8b4513 firebrick1 ff3030 "
+    "firebrick2 ee2c2c firebrick3 cd2626 firebrick4 8b1a1a brown1 ff4040 "
+    "brown2 ee3b3b brown3 cd3333 brown4 8b2323 salmon1 ff8c69 "
+    "salmon2 ee8262 salmon3 cd7054 salmon4 8b4c39 lightsalmon1 ffa07a "
+    "lightsalmon2 ee9572 lightsalmon3 cd8162 lightsalmon4 8b5742 "
+    "orange1 ffa500 orange2 ee9a00 orange3 cd8500 orange4 8b5a00 "
+    "darkorange1 ff7f00 darkorange2 ee7600 darkorange3 cd6600 "
+    "darkorange4 8b4500 coral1 ff7256 coral2 ee6a50 coral3 cd5b45 "
+    "coral4 8b3e2f tomato1 ff6347 tomato2 ee5c42 tomato3 cd4f39 "
+    "tomato4 8b3626 orangered1 ff4500 orangered2 ee4000 orangered3 cd3700 "
+    "orangered4 8b2500 red1 ff0000 red2 ee0000 red3 cd0000 red4 8b0000 "
+    "debianred d70751 deeppink1 ff1493 deeppink2 ee1289 deeppink3 cd1076 "
+    "deeppink4 8b0a50 hotpink1 ff6eb4 hotpink2 ee6aa7 hotpink3 cd6090 "
+    "hotpink4 8b3a62 pink1 ffb5c5 pink2 eea9b8 pink3 cd919e pink4 8b636c "
+    "lightpink1 ffaeb9 lightpink2 eea2ad lightpink3 cd8c95 "
+    "lightpink4 8b5f65 palevioletred1 ff82ab palevioletred2 ee799f "
+    "palevioletred3 cd6889 palevioletred4 8b475d maroon1 ff34b3 "
+    "maroon2 ee30a7 maroon3 cd2990 maroon4 8b1c62 violetred1 ff3e96 "
+    "violetred2 ee3a8c violetred3 cd3278 violetred4 8b2252 magenta1 ff00ff "
+    "magenta2 ee00ee magenta3 cd00cd magenta4 8b008b orchid1 ff83fa "
+    "orchid2 ee7ae9 orchid3 cd69c9 orchid4 8b4789 plum1 ffbbff "
+    "plum2 eeaeee plum3 cd96cd plum4 8b668b mediumorchid1 e066ff "
+    "mediumorchid2 d15fee mediumorchid3 b452cd mediumorchid4 7a378b "
+    "darkorchid1 bf3eff darkorchid2 b23aee darkorchid3 9a32cd "
+    "darkorchid4 68228b purple1 9b30ff purple2 912cee purple3 7d26cd "
+    "purple4 551a8b mediumpurple1 ab82ff mediumpurple2 9f79ee "
+    "mediumpurple3 8968cd mediumpurple4 5d478b thistle1 ffe1ff "
+    "thistle2 eed2ee thistle3 cdb5cd thistle4 8b7b8b darkgrey a9a9a9 "
+    "darkgray a9a9a9 darkblue 00008b darkcyan 008b8b darkmagenta 8b008b "
+    "darkred 8b0000 lightgreen 90ee90")
+
+
+##########################################################################
+# Raster backend
+#
+# A "raster" window is a null window that can also render its scene
+# into an RGB image with GraphWin.snapshot, so that drawing can be
+# checked against golden images without a display. Rendering is done
+# only when a snapshot is taken. Every shape is reduced to horizontal
+# pixel spans, a pixel being covered when its center is inside the
+# shape, and each span is written with one slice assignment. As in Tk,
+# the center of pixel (x, y) is at canvas coordinates (x, y).
+
+# Number of lines whose pixel runs a raster window keeps between
+# snapshots
+RASTER_CACHE_SIZE = 1024
+
+class _RasterCanvas(_NullCanvas):
+
+    """Headless canvas that renders its scene on request"""
+
+    def _open(self, title, width, height):
+        # the pixel runs of the lines and texts drawn by recent
+        #   snapshots, which mostly change color rather than shape from
+        #   one to the next
+        self._runCache = OrderedDict()
+        _NullCanvas._open(self, title, width, height)
+
+    def snapshot(self):
+        width = self.options["width"]
+        height = self.options["height"]
+        raster = _Raster(width, height,
+                         _rasterColor(self.options["bg"]) or b"\0\0\0",
+                         self._runCache)
+        for item in self._visible():
+            getattr(raster, item["type"])(item["coords"], item["options"])
+        return Frame(width, height, bytes(raster.buf))
+
+    def _visible(self):
+        # The items to render, bottom first, leaving out hidden ones
+        #   and shapes entirely behind a filled rectangle above them
+        covers = []
+        visible = []
+        for item in reversed(list(self.scene.values())):
+            options = item["options"]
+            if options.get("state") == "hidden":
+                continue
+            if item["type"] in ("line", "rectangle", "oval", "polygon"):
+                xy = item["coords"]
+                pad = float(options.get("width", 1)) / 2.0 + 1
+                x1 = max(0, min(xy[0::2]) - pad)
+                y1 = max(0, min(xy[1::2]) - pad)
+                x2 = min(self.options["width"], max(xy[0::2]) + pad)
+                y2 = min(self.options["height"], max(xy[1::2]) + pad)
+                if any(c[0] <= x1 and c[1] <= y1 and x2 <= c[2] and y2 <= c[3]
+                       for c in covers):
+                    continue
+                if item["type"] == "rectangle" and options.get("fill"):
+                    covers.append((min(xy[0], xy[2]), min(xy[1], xy[3]),
+                                   max(xy[0], xy[2]), max(xy[1], xy[3])))
+            visible.append(item)
+        visible.reverse()
+        return visible
+
+
+class _Raster:
+
+    # Draws canvas items into an RGB bytearray, with the Tk defaults
+    #   for options the item does not have
+
+    def __init__(self, width, height, background, runCache=None):
+        self.width = width
+        self.height = height
+        self.buf = bytearray(background * (width * height))
+        self.runCache = OrderedDict() if runCache is None else runCache
+
+    def span(self, y, x1, x2, color):
+        # Pixels x1 <= x < x2 of row y
+        if 0 <= y < self.height:
+            if x1 < 0: x1 = 0
+            if x2 > self.width: x2 = self.width
+            if x1 < x2:
+                i = (y * self.width + x1) * 3
+                self.buf[i:i + (x2 - x1) * 3] = color * (x2 - x1)
+
+    # Lines and texts are drawn as runs: dictionaries listing the
+    #   (start, stop) slices of buf they cover by length in pixels.
+    #   Most of the work of a snapshot is in finding them, so the runs
+    #   of the last RASTER_CACHE_SIZE lines and texts are kept and
+    #   only recolored.
+
+    def cachedRuns(self, key):
+        runs = self.runCache.get(key)
+        if runs is not None:
+            self.runCache.move_to_end(key)
+        return runs
+
+    def cacheRuns(self, key, runs):
+        cache = self.runCache
+        cache[key] = runs
+        if len(cache) > RASTER_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def addRun(self, runs, y, x1, x2):
+        # Add pixels x1 <= x < x2 of row y to runs
+        if 0 <= y < self.height:
+            if x1 < 0: x1 = 0
+            if x2 > self.width: x2 = self.width
+            if x1 < x2:
+                i = (y * self.width + x1) * 3
+                n = x2 - x1
+                if n in runs:
+                    runs[n].append((i, i + n * 3))
+                else:
+                    runs[n] = [(i, i + n * 3)]
+
+    def fillRuns(self, runs, color):
+        buf = self.buf
+        for n, slices in runs.items():
+            run = color * n
+            for start, stop in slices:
+                buf[start:stop] = run
+
+    def rows(self, y1, y2):
+        # Rows whose centers lie in [y1, y2), clipped to the image
+        return range(max(0, _pixel(y1)), min(self.height, _pixel(y2)))
+
+    def polygon(self, coords, options):
+        fill = _rasterColor(options.get("fill", "black"))
+        if fill:
+            self.fillPolygon(coords, fill)
+        outline = _rasterColor(options.get("outline", ""))
+        if outline and len(coords) >= 4:
+            self.polyline(list(coords) + list(coords[:2]),
+                          float(options.get("width", 1)), outline)
+
+    def crossings(self, x1, y1, x2, y2):
+        # The rows crossed by the edge from (x1,y1) down to (x2,y2), and
+        #   the pixel at which the edge crosses each of them
+        rows = self.rows(y1, y2)
+        if not rows:
+            return rows, []
+        slope = (x2 - x1) / float(y2 - y1)
+        x = x1 + (rows[0] - y1) * slope
+        ceil = math.ceil
+        return rows, [ceil(x + k * slope) for k in range(len(rows))]
+
+    def fillPolygon(self, xy, color):
+        # Even-odd scanline fill, between pairs of edge crossings
+        crossings = {}
+        n = len(xy)
+        for i in range(0, n, 2):
+            x1, y1 = xy[i], xy[i+1]
+            x2, y2 = xy[(i+2) % n], xy[(i+3) % n]
+            if y1 > y2:
+                x1, y1, x2, y2 = x2, y2, x1, y1
+            rows, xs = self.crossings(x1, y1, x2, y2)
+            for y, x in zip(rows, xs):
+                if y in crossings:
+                    crossings[y].append(x)
+                else:
+                    crossings[y] = [x]
+        span = self.span
+        for y, xs in crossings.items():
+            xs.sort()
+            for i in range(0, len(xs) - 1, 2):
+                span(y, xs[i], xs[i+1], color)
+
+    def convexRuns(self, xy, runs):
+        # Add the pixels of a convex polygon to runs. The edges from the
+        #   top vertex down to the bottom one going either way round
+        #   give the two ends of every row, so the rows are found in
+        #   one pass.
+        n = len(xy) // 2
+        ys = xy[1::2]
+        top, bottom = ys.index(min(ys)), ys.index(max(ys))
+        rows = self.rows(ys[top], ys[bottom])
+        if not rows:
+            return
+        sides = []
+        for step in (1, -1):
+            side = []
+            i = top
+            while i != bottom:
+                j = (i + step) % n
+                side.extend(self.crossings(xy[2*i], xy[2*i+1],
+                                           xy[2*j], xy[2*j+1])[1])
+                i = j
+            sides.append(side)
+        left, right = sides
+        if left[len(left) // 2] > right[len(right) // 2]:
+            left, right = right, left
+        width = self.width
+        if min(left) < 0 or max(right) > width:
+            left = [max(0, x) for x in left]
+            right = [min(width, x) for x in right]
+        stride = width * 3
+        i = rows[0] * stride
+        for x1, x2 in zip(left, right):
+            if x1 < x2:
+                n = x2 - x1
+                if n in runs:
+                    runs[n].append((i + x1 * 3, i + x2 * 3))
+                else:
+                    runs[n] = [(i + x1 * 3, i + x2 * 3)]
+            i = i + stride
+
+    def polyline(self, xy, width, color):
+        # Each segment as a width-wide quadrilateral, with butt ends
+        key = ("line", tuple(xy), width)
+        runs = self.cachedRuns(key)
+        if runs is None:
+            runs = {}
+            half = max(width, 1.0) / 2.0
+            for i in range(0, len(xy) - 2, 2):
+                x1, y1, x2, y2 = xy[i], xy[i+1], xy[i+2], xy[i+3]
+                dx, dy = x2 - x1, y2 - y1
+                length = (dx * dx + dy * dy) ** 0.5
+                if length == 0:
+                    continue
+                nx, ny = -dy / length * half, dx / length * half
+                self.convexRuns([x1 + nx, y1 + ny, x2 + nx, y2 + ny,
+                                 x2 - nx, y2 - ny, x1 - nx, y1 - ny], runs)
+            self.cacheRuns(key, runs)
+        self.fillRuns(runs, color)
+
+    def line(self, coords, options):
+        color = _rasterColor(options.get("fill", "black"))
+        if color:
+            self.polyline(coords, float(options.get("width", 1)), color)
+
+    def box(self, x1, y1, x2, y2, color):
+        # Fill the pixels with centers in [x1, x2) x [y1, y2)
+        x1, x2 = max(0, _pixel(x1)), min(self.width, _pixel(x2))
+        if x1 < x2:
+            rows = self.rows(y1, y2)
+            stride = self.width * 3
+            run = color * (x2 - x1)
+            buf = self.buf
+            for i in range(rows.start * stride + x1 * 3,
+                           rows.stop * stride + x1 * 3, stride):
+                buf[i:i + len(run)] = run
+
+    def rectangle(self, coords, options):
+        x1, y1, x2, y2 = coords[:4]
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        fill = _rasterColor(options.get("fill", ""))
+        if fill:
+            self.box(x1, y1, x2, y2, fill)
+        outline = _rasterColor(options.get("outline", "black"))
+        if outline:
+            half = float(options.get("width", 1)) / 2.0
+            if x2 - x1 > 2 * half and y2 - y1 > 2 * half:
+                self.box(x1 - half, y1 - half, x2 + half, y1 + half, outline)
+                self.box(x1 - half, y2 - half, x2 + half, y2 + half, outline)
+                self.box(x1 - half, y1 + half, x1 + half, y2 - half, outline)
+                self.box(x2 - half, y1 + half, x2 + half, y2 - half, outline)
+            else:
+                self.box(x1 - half, y1 - half, x2 + half, y2 + half, outline)
+
+    def oval(self, coords, options):
+        x1, y1, x2, y2 = coords[:4]
+        cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
+        rx, ry = abs(x2 - x1) / 2.0, abs(y2 - y1) / 2.0
+        fill = _rasterColor(options.get("fill", ""))
+        if fill:
+            for y in self.rows(cy - ry, cy + ry):
+                dx = _ellipseHalf(rx, ry, y - cy)
+                if dx is not None:
+                    self.span(y, _pixel(cx - dx), _pixel(cx + dx), fill)
+        outline = _rasterColor(options.get("outline", "black"))
+        if outline:
+            half = float(options.get("width", 1)) / 2.0
+            for y in self.rows(cy - ry - half, cy + ry + half):
+                outer = _ellipseHalf(rx + half, ry + half, y - cy)
+                if outer is None:
+                    continue
+                inner = None
+                if rx > half and ry > half:
+                    inner = _ellipseHalf(rx - half, ry - half, y - cy)
+                if inner is None:
+                    self.span(y, _pixel(cx - outer), _pixel(cx + outer),
+                              outline)
+                else:
+                    self.span(y, _pixel(cx - outer), _pixel(cx - inner),
+                              outline)
+                    self.span(y, _pixel(cx + inner), _pixel(cx + outer),
+                              outline)
+
+    def text(self, coords, options):
+        color = _rasterColor(options.get("fill", "black"))
+        text = str(options.get("text", ""))
+        if not color or not text:
+            return
+        font = options.get("font", DEFAULT_CONFIG["font"])
+        anchor = options.get("anchor", "center")
+        justify = options.get("justify", "left")
+        key = ("text", text, font if isinstance(font, str) else tuple(font),
+               anchor, justify, coords[0], coords[1])
+        runs = self.cachedRuns(key)
+        if runs is None:
+            runs = self.textRuns(text, font, anchor, justify, coords)
+            self.cacheRuns(key, runs)
+        self.fillRuns(runs, color)
+
+    def textRuns(self, text, font, anchor, justify, coords):
+        if isinstance(font, str) and font in _NullFont.fonts:
+            font = _NullFont.fonts[font]
+        else:
+            font = _font(tuple(font), True)
+        em = font._em()
+        advance = 0.6 * em
+        linespace = font.metrics("linespace")
+        sx = max(1, int(round(advance / 6)))
+        sy = max(1, int(round(linespace / 8.0)))
+        lines = text.split("\n")
+        blockWidth = max(len(line) for line in lines) * advance
+        fx, fy = _ANCHORS.get(anchor, (1, 1))
+        left = coords[0] - blockWidth * fx / 2.0
+        top = coords[1] - len(lines) * linespace * fy / 2.0
+        runs = {}
+        for row, line in enumerate(lines):
+            lineLeft = left
+            if justify == "right":
+                lineLeft = left + blockWidth - len(line) * advance
+            elif justify == "center":
+                lineLeft = left + (blockWidth - len(line) * advance) / 2.0
+            y0 = int(round(top + row * linespace + (linespace - 7 * sy) / 2.0))
+            for i, char in enumerate(line):
+                x0 = int(round(lineLeft + i * advance))
+                for gy, gx1, gx2 in _glyphSpans(char, sx, sy):
+                    self.addRun(runs, y0 + gy, x0 + gx1, x0 + gx2)
+        return runs
+
+    def image(self, coords, options):
+        img = options.get("image")
+        pixels = getattr(img, "pixels", None)
+        if not pixels:
+            return
+        w, h = img.width(), img.height()
+        fx, fy = _ANCHORS.get(options.get("anchor", "center"), (1, 1))
+        left = int(coords[0] - w * fx // 2)
+        top = int(coords[1] - h * fy // 2)
+        for (px, py), rgb in pixels.items():
+            if 0 <= px < w and 0 <= py < h:
+                self.span(top + py, left + px, left + px + 1, bytes(rgb))
+
+    def window(self, coords, options):
+        pass # embedded widgets (Entry) have nothing to render
+
+
+# Where the anchor point of text and images lies, in halves of the
+# width and height from their left and top edges
+_ANCHORS = {"nw": (0, 0), "n": (1, 0), "ne": (2, 0),
+            "w": (0, 1), "center": (1, 1), "e": (2, 1),
+            "sw": (0, 2), "s": (1, 2), "se": (2, 2)}
+
+def _pixel(x):
+    # Index of the first pixel whose center is at or right of x
+    return int(math.ceil(x))
+
+def _ellipseHalf(rx, ry, dy):
+    # Half the width of an ellipse with radii rx, ry at dy from its
+    #   center, or None outside it
+    if ry <= 0 or abs(dy) >= ry:
+        return None
+    t = dy / ry
+    return rx * math.sqrt(1.0 - t * t)
+
+_rasterColors = {"": None}
+
+def _rasterColor(color):
+    # A color option as 3 bytes, or None for no color
+    try:
+        return _rasterColors[color]
+    except KeyError:
+        rgb = _rasterColors[color] = bytes(_rgb(color))
+        return rgb
+
+# The bundled 5x7 font for printable ASCII, five bytes per character,
+# one per column, left to right, with bit 0 the top row. Any other
+# character is drawn as an empty box.
+_FONT_5X7 = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12"
+    "2313086462" "3649552250" "0005030000" "001c224100" "0041221c00"
+    "142a1c2a14" "08083e0808" "0050300000" "0808080808" "0060600000"
+    "2010080402" "3e5149453e" "00427f4000" "4261514946" "2141454b31"
+    "1814127f10" "2745454539" "3c4a494930" "0171090503" "3649494936"
+    "064949291e" "0036360000" "0056360000" "0814224100" "1414141414"
+    "0041221408" "0201510906" "324979413e" "7e1111117e" "7f49494936"
+    "3e41414122" "7f4141221c" "7f49494941" "7f09090101" "3e41415132"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040"
+    "7f0204027f" "7f0408107f" "3e4141413e" "7f09090906" "3e4151215e"
+    "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f"
+    "7f2018207f" "6314081463" "0304780403" "6151494543" "007f414100"
+    "0204081020" "0041417f00" "0402010204" "4040404040" "0001020400"
+    "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418"
+    "087e090102" "0c5252523e" "7f08040478" "00447d4000" "2040443d00"
+    "007f102844" "00417f4000" "7c04180478" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020"
+    "3c4040207c" "1c2040201c" "3c4030403c" "4428102844" "0c5050503c"
+    "4464544c44" "0008364100" "00007f0000" "0041360800" "0804081008")
+_BOX_GLYPH = bytes.fromhex("7f4141417f")
+
+_glyphCache = {}
+
+def _glyphSpans(char, sx, sy):
+    # The pixel spans (row, x1, x2) of a character scaled by sx, sy
+    key = (char, sx, sy)
+    try:
+        return _glyphCache[key]
+    except KeyError:
+        pass
+    code = ord(char)
+    if char == " ":
+        columns = bytes(5)
+    elif 32 < code < 127:
+        columns = _FONT_5X7[(code - 32) * 5:(code - 31) * 5]
+    else:
+        columns = _BOX_GLYPH
+    spans = []
+    for row in range(7):
+        col = 0
+        while col < 5:
+            if columns[col] >> row & 1:
+                start = col
+                while col < 5 and columns[col] >> row & 1:
+                    col = col + 1
+                for dy in range(sy):
+                    spans.append((row * sy + dy, start * sx, col * sx))
+            else:
+                col = col + 1
+    spans = _glyphCache[key] = tuple(spans)
+    return spans
+
+
+class Frame:
+
+    """An RGB image of the contents of a window, as returned by
+    GraphWin.snapshot on the raster backend. data holds the pixels as
+    bytes, three per pixel, row by row from the top."""
+
+    def __init__(self, width, height, data):
+        self.width = width
+        self.height = height
+        self.data = data
+
+    def __repr__(self):
+        return "Frame({}, {})".format(self.width, self.height)
+
+    def __eq__(self, other):
+        return (isinstance(other, Frame) and self.width == other.width
+                and self.height == other.height and self.data == other.data)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def getPixel(self, x, y):
+        """Returns a list [r,g,b] with the RGB color values for pixel (x,y)"""
+        i = (y * self.width + x) * 3
+        return list(self.data[i:i+3])
+
+    def to_array(self):
+        """Returns the frame as a NumPy uint8 array of shape
+        (height, width, 3). Requires NumPy."""
+        if numpy is None:
+            raise GraphicsError("NumPy is not available")
+        return numpy.frombuffer(self.data, numpy.uint8).reshape(
+            self.height, self.width, 3)
+
+    def _mask(self, other):
+        # One byte per pixel, zero where the pixel is the same in the
+        #   same sized other. The two frames are XORed as big integers
+        #   and each pixel's three bytes ORed into its last one.
+        if (self.width, self.height) != (other.width, other.height):
+            raise GraphicsError("frames differ in size")
+        x = (int.from_bytes(self.data, "big")
+             ^ int.from_bytes(other.data, "big"))
+        x = x | x >> 8 | x >> 16
+        return x.to_bytes(len(self.data), "big")[2::3]
+
+    def diff(self, other):
+        """Returns the number of pixels that differ from Frame other"""
+        mask = self._mask(other)
+        return len(mask) - mask.count(0)
+
+    def diffBox(self, other):
+        """Returns the smallest box (x1, y1, x2, y2), x2 and y2 exclusive,
+        holding all the pixels that differ from Frame other, or None
+        if the frames are the same"""
+        mask = self._mask(other)
+        changed = mask.strip(b"\0")
+        if not changed:
+            return None
+        w = self.width
+        y1 = (len(mask) - len(mask.lstrip(b"\0"))) // w
+        y2 = (len(mask.rstrip(b"\0")) - 1) // w + 1
+        columns = 0
+        for y in range(y1, y2):
+            columns = columns | int.from_bytes(mask[y*w:(y+1)*w], "big")
+        columns = columns.to_bytes(w, "big")
+        return (w - len(columns.lstrip(b"\0")), y1,
+                len(columns.rstrip(b"\0")), y2)
+
+    def save(self, filename):
+        """Saves the frame to filename as a binary PPM image"""
+        with open(filename, "wb") as f:
+            f.write(b"P6\n%d %d\n255\n" % (self.width, self.height))
+            f.write(self.data)
+
+
+def loadFrame(filename):
+    """Returns the Frame stored in a binary PPM image file, such as one
+    written by Frame.save"""
+    with open(filename, "rb") as f:
+        data = f.read()
+    fields = []
+    pos = 0
+    while len(fields) < 4:
+        while data[pos:pos+1].isspace():
+            pos = pos + 1
+        if data[pos:pos+1] == b"#":
+            pos = data.index(b"\n", pos)
+            continue
+        end = pos
+        while not data[end:end+1].isspace():
+            end = end + 1
+        fields.append(data[pos:end])
+        pos = end
+    if fields[0] != b"P6" or fields[3] != b"255":
+        raise GraphicsError("couldn't recognize data in image file")
+    width, height = int(fields[1]), int(fields[2])
+    pixels = data[pos+1:pos+1 + width * height * 3]
+    return Frame(width, height, pixels)
+
+
+##########################################################################
+# Colors
+
+# Color strings already built by color_rgb and fade_ramp, so that fade
+# loops asking for the same colors every frame reuse them
+_colorCache = {}
+_rampCache = {}
+
 def color_rgb(r,g,b):
     """r,g,b are intensities of red, green, and blue in range(256)
     Returns color specifier string for the resulting color"""
-    return "#%02x%02x%02x" % (r,g,b)
+    key = (r,g,b)
+    try:
+        return _colorCache[key]
+    except KeyError:
+        if len(_colorCache) >= 65536:
+            _colorCache.clear()
+        color = _colorCache[key] = "#%02x%02x%02x" % (r,g,b)
+        return color
+
+def fade_ramp(rgb, step=51, start=255):
+    """Return a tuple of color strings fading in to the color rgb (a
+    sequence r,g,b). Entry k is each component of rgb darkened by
+    start-k*step, clipped at 0, so the ramp starts from black when
+    start >= max(rgb) and ends at rgb itself. Reverse it to fade out.
+    Ramps are cached, so fade loops can index them every frame."""
+    key = (tuple(rgb), step, start)
+    try:
+        return _rampCache[key]
+    except KeyError:
+        r,g,b = key[0]
+        ramp = _rampCache[key] = tuple(
+            color_rgb(max(0, r-i), max(0, g-i), max(0, b-i))
+            for i in range(start, -step, -step))
+        return ramp
 
 def test():
     win = GraphWin()
@@ -1008,8 +4281,5 @@ def test():
 #MacOS fix 2
 #tk.Toplevel(_root).destroy()
 
-# MacOS fix 1
-update()
-
 if __name__ == "__main__":
     test()
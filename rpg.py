@@ -29,14 +29,12 @@
 """
 
 from graphics import *
-from time import sleep
 from random import randint, choice
 
 # General effect functions
 def fadeaway(obj,spd):
-	for i in range(51,-1,-1):
-		obj.setFill(color_rgb(i*5,i*5,i*5))
-		sleep(1.0/spd)
+	for col in FrameClock(spd).steps(reversed(fade_ramp([255,255,255],5))):
+		obj.setFill(col)
 	obj.setText("")
 	
 # Curtain functions
@@ -49,18 +47,16 @@ def curtain_make(win):
 	return obj
 		
 def curtain_open(obj):
-	anchor = obj[0].getP2().getX()
-	for i in range(160):
-		obj[0].move(-2,0)
-		obj[1].move(2,0)
-		sleep(1.0/120)
+	left = obj[0].animate(dx=-320,duration=160/120.0)
+	right = obj[1].animate(dx=320,duration=160/120.0)
+	left.join()
+	right.join()
 	
 def curtain_close(obj):
-	anchor = obj[0].getP2().getX()
-	for i in range(160):
-		obj[0].move(2,0)
-		obj[1].move(-2,0)
-		sleep(1.0/120)
+	left = obj[0].animate(dx=320,duration=160/120.0)
+	right = obj[1].animate(dx=-320,duration=160/120.0)
+	left.join()
+	right.join()
 
 # Enemy functions
 def enemy_make(win):
@@ -69,9 +65,8 @@ def enemy_make(win):
 	obj.setFace("courier")
 	obj.setFill(color_rgb(255,255,255))
 	obj.setStyle("bold")
-	for i in range(5,31):
+	for i in FrameClock(30).steps(range(5,31)):
 		obj.setSize(i)
-		sleep(1.0/30)
 	return obj
 	
 def enemy_get(obj):
@@ -80,13 +75,11 @@ def enemy_get(obj):
 	
 def enemy_set(obj,face):
 	if enemy_get(obj) != face:
-		for i in range(31,36):
+		for i in FrameClock(30).steps(range(31,36)):
 			obj.setSize(i)
-			sleep(1.0/30)
 		obj.setText(face)
-		for i in range(35,29,-1):
+		for i in FrameClock(30).steps(range(35,29,-1)):
 			obj.setSize(i)
-			sleep(1.0/30)
 	else:
 		return
 		
@@ -97,35 +90,30 @@ def hp_make(win):
 	obj.setFace("courier")
 	obj.setFill(color_rgb(255,255,255))
 	obj.setStyle("normal")
-	for i in range(5,13):
+	for i in FrameClock(30).steps(range(5,13)):
 		obj.setSize(i)
-		sleep(1.0/30)
 	return obj
 	
 def hp_set(obj,new,spd):
 	oldlist = obj.getText().split(":")
 	old = int(oldlist[1])
 	if new != old:
-		for i in range(12,17):
+		for i in FrameClock(30).steps(range(12,17)):
 			obj.setSize(i)
-			sleep(1.0/30)
 		if new > old:
-			for i in range(old,new+1):
+			for i in FrameClock(spd).steps(range(old,new+1)):
 				if i > 99:
 					obj.setText("HP:{:02d}".format(99))
 					break
 				obj.setText("HP:{:02d}".format(i))
-				sleep(1.0/spd)
 		elif new < old:
-			for i in range(old,new-1,-1):
+			for i in FrameClock(spd).steps(range(old,new-1,-1)):
 				if i < 0:
 					obj.setText("HP:{:02d}".format(0))
 					break
 				obj.setText("HP:{:02d}".format(i))
-				sleep(1.0/spd)
-		for i in range(16,11,-1):
+		for i in FrameClock(30).steps(range(16,11,-1)):
 			obj.setSize(i)
-			sleep(1.0/30)	
 	elif new == old:
 		obj.setText("HP:{:02d}".format(i))
 	return new
@@ -145,32 +133,27 @@ def ehp_make(win):
 	obj.setFace("courier")
 	obj.setFill(color_rgb(255,255,255))
 	obj.setStyle("bold")
-	for i in range(5,16):
+	for i in FrameClock(30).steps(range(5,16)):
 		obj.setSize(i)
-		sleep(1.0/30)
 	return obj
 	
 def ehp_set(obj,new,spd):
 	oldlist = obj.getText().split(":")
 	old = int(oldlist[1])
 	if new != old:
-		for i in range(15,21):
+		for i in FrameClock(30).steps(range(15,21)):
 			obj.setSize(i)
-			sleep(1.0/30)	
 		if new > old:
-			for i in range(old,new+1):
+			for i in FrameClock(spd).steps(range(old,new+1)):
 				obj.setText("BOSS:\n{:03d}".format(i))
-				sleep(1.0/spd)
 		elif new < old:
-			for i in range(old,new-1,-1):
+			for i in FrameClock(spd).steps(range(old,new-1,-1)):
 				if i < 0:
 					obj.setText("BOSS:\n{:03d}".format(0))
 					break
 				obj.setText("BOSS:\n{:03d}".format(i))
-				sleep(1.0/spd)		
-		for i in range(20,14,-1):
+		for i in FrameClock(30).steps(range(20,14,-1)):
 			obj.setSize(i)
-			sleep(1.0/30)	
 	elif new == old:
 		obj.setText("BOSS:\n{:03d}".format(i))
 	return new
@@ -189,9 +172,8 @@ def text_set(obj,str):
 	if len(str) == 0:
 		obj.setText("")
 	else:
-		for i in range(len(str)):
+		for i in FrameClock(30).steps(range(len(str))):
 			obj.setText("<{}>".format(str[:i+1]))
-			sleep(1.0/30)	
 		sleep(1)
 	
 # Option functions
@@ -202,34 +184,20 @@ def option_make(win):
 		obj[i].draw(win)
 		obj[i].setFace("courier")
 		obj[i].setStyle("bold")
+		win.addRegion(Rectangle(Point(i*160,320),Point(i*160+160,480)),value=i)
 	return obj
 	
 def option_clear(obj,index):
-	for i in range(12,26):
+	for i in FrameClock(30).steps(range(12,26)):
 		obj[index].setSize(i)
-		sleep(1.0/30)
-	for i in range(51,-1,-1):
+	for col in FrameClock(60).steps(reversed(fade_ramp([255,255,255],5))):
 		for j in range(4):
-			obj[j].setFill(color_rgb(i*5,i*5,i*5))
-		sleep(1.0/60)
+			obj[j].setFill(col)
 	for i in range(4):
 		obj[i].setText("")
 
 def option_select(obj,win):
-	pick = win.getMouse()
-	if pick.getY() > 320:
-		if pick.getX() < 160:
-			return 0
-		elif pick.getX() > 160 and pick.getX() < 320:
-			return 1
-		elif pick.getX() > 320 and pick.getX() < 480:
-			return 2
-		elif pick.getX() > 480:
-			return 3
-		else:
-			return option_select(obj,win)
-	else:
-		return option_select(obj,win)
+	return win.getRegion().value
 		
 def option_set(obj,win,a,b,c,d):
 	list = [str(a),str(b),str(c),str(d)]
@@ -237,20 +205,17 @@ def option_set(obj,win,a,b,c,d):
 		obj[i].setSize(5)
 		obj[i].setFill(color_rgb(255,255,255))
 		obj[i].setText(list[i])
-		for j in range(5,13):
+		for j in FrameClock(30).steps(range(5,13)):
 			obj[i].setSize(j)
-			sleep(1.0/30)	
 	res = option_select(obj,win)
 	option_clear(obj,res)
 	return res
 	
 # Damage flash function
 def flash(obj,times):
-	for i in range(times):
-		sleep(1.0/10)
-		obj.setFill(color_rgb(0,0,0))
-		sleep(1.0/10)
-		obj.setFill(color_rgb(255,255,255))
+	sleep(1.0/10)
+	for col in FrameClock(10).steps([color_rgb(0,0,0),color_rgb(255,255,255)]*times):
+		obj.setFill(col)
 
 # Enemy event function
 def enemy_event(r,e,t,h,eh,c,curt):
@@ -29,7 +29,6 @@
 """
 
 from graphics import *
-from time import sleep
 from random import randint, choice
 
 win = GraphWin("RPG2",640,480)
@@ -63,13 +62,13 @@ class Message(object):
 		self.obj.setSize(size)
 		
 	def set(self,str,r=255,g=255,b=255):
+		str = self.obj.wrap(str,600)
 		self.obj.setFill(color_rgb(r,g,b))
 		self.obj.setText("")
 		sleep(0.1)
 		if len(str) > 0:
-			for i in range(len(str)+1):
+			for i in FrameClock(50).steps(range(len(str)+1)):
 				self.obj.setText("{}".format(str[:i]))
-				sleep(0.02)	
 			sleep(1)
 		
 # Options task
@@ -79,13 +78,15 @@ class Option(object):
 		self.box = []
 		self.min = []
 		self.max = []
+		self.regions = []
+		self.pool = ItemPool(win)
 		
 	def set(self,opts):
 		#Before selection
 		start = 320-(len(opts)-1)*50
 		for i in range(len(opts)):
 			self.txt.append(Text(Point(start+i*100,430),opts[i]))
-			self.txt[i].draw(win)
+			self.pool.draw(self.txt[i])
 			self.txt[i].setSize(5)
 			self.txt[i].setFill(color_rgb(255,255,255))
 			self.txt[i].setFace("courier")
@@ -93,45 +94,38 @@ class Option(object):
 			self.min.append(start-50+i*100)
 			self.max.append(start+50+i*100)
 			self.box.append(Rectangle(Point(self.min[i]+5,420),Point(self.max[i]-5,440)))
-			self.box[i].draw(win)
-			for j in range(6,11):
+			self.pool.draw(self.box[i])
+			self.regions.append(win.addRegion(Rectangle(Point(self.min[i],420),Point(self.max[i],440)),value=i))
+			for j in FrameClock(100).steps(range(6,11)):
 				self.txt[i].setSize(j)
-				sleep(0.01)
-			for j in range(52):
-				self.box[i].setOutline(color_rgb(j*5,j*5,j*5))
-				sleep(0.005)
+			for col in FrameClock(200).steps(fade_ramp([255,255,255],5)):
+				self.box[i].setOutline(col)
 		res = self.select()
+		for region in self.regions:
+			win.removeRegion(region)
 		
 		#After selection
 		restxt,resbox = self.txt.pop(res),self.box.pop(res)
-		for i in range(51,-1,-1):
-			for j in range(len(opts)-1):
-				self.txt[j].setFill(color_rgb(i*5,i*5,i*5))
-				self.box[j].setOutline(color_rgb(i*5,i*5,i*5))
-			resbox.setOutline(color_rgb(i*5,i*5,i*5))
-			sleep(0.005)
+		for col in FrameClock(200).steps(reversed(fade_ramp([255,255,255],5))):
+			with win.frame():
+				for j in range(len(opts)-1):
+					self.txt[j].setFill(col)
+					self.box[j].setOutline(col)
+				resbox.setOutline(col)
 		for i in range(len(opts)-1):
-			self.txt[i].undraw()
-			self.box[i].undraw()
-		resbox.undraw()
-		for i in range(10,19):
+			self.pool.undraw(self.txt[i])
+			self.pool.undraw(self.box[i])
+		self.pool.undraw(resbox)
+		for i in FrameClock(100).steps(range(10,19)):
 			restxt.setSize(i)
-			sleep(0.01)
-		for i in range(51,-1,-1):
-			restxt.setFill(color_rgb(i*5,i*5,i*5))
-			sleep(0.01)
-		restxt.undraw()
-		del(self.txt[:], self.box[:], self.max[:], self.min[:], restxt, resbox)
+		for col in FrameClock(100).steps(reversed(fade_ramp([255,255,255],5))):
+			restxt.setFill(col)
+		self.pool.undraw(restxt)
+		del(self.txt[:], self.box[:], self.max[:], self.min[:], self.regions[:], restxt, resbox)
 		return res
 		
 	def select(self):
-		pick = win.getMouse()
-		if pick.getY() >= 420 and pick.getY() < 440 and pick.getX() >= self.min[0] and pick.getX() < self.max[-1]:
-			for i in range(len(self.txt)):
-				if pick.getX() >= self.min[i] and pick.getX() < self.max[i]:
-					return i
-		else:
-			return self.select()
+		return win.getRegion().value
 			
 # Health HUD class
 class HP(object):
@@ -151,9 +145,8 @@ class HP(object):
 	def set(self,obj,value):
 		if self.drawn == 0:
 			self.obj.draw(win)
-			for i in range(6,13):
+			for i in FrameClock(100).steps(range(6,13)):
 				self.obj.setSize(i)
-				sleep(0.01)
 			self.drawn = 1
 		self.hp = self.iterate(self.hp,value)
 		obj.hp = self.hp
@@ -164,28 +157,23 @@ class HP(object):
 		elif new < 0:
 			new = 0
 		if new != old:
-			for i in range(14,17):
+			for i in FrameClock(20).steps(range(14,17)):
 				self.obj.setSize(i)
-				sleep(0.05)
 			if new > old:
-				for i in range(old,new+1):
+				for i in FrameClock(500).steps(range(old,new+1)):
 					self.obj.setText("{0}:{1:03d}".format(self.name,i))
-					sleep(0.002)
 			elif new < old:
-				for i in range(old,new-1,-1):
+				for i in FrameClock(500).steps(range(old,new-1,-1)):
 					self.obj.setText("{0}:{1:03d}".format(self.name,i))
-					sleep(0.002)
-			for i in range(16,11,-1):
+			for i in FrameClock(20).steps(range(16,11,-1)):
 				self.obj.setSize(i)
-				sleep(0.05)
 		elif new == old:
 			self.obj.setText("{0}:{1:03d}".format(self.name,new))
 		return new
 		
 	def fade(self):
-		for i in range(51,-1,-1):
-			self.obj.setFill(color_rgb(i*5,i*5,i*5))
-			sleep(0.01)
+		for col in FrameClock(100).steps(reversed(fade_ramp([255,255,255],5))):
+			self.obj.setFill(col)
 		self.obj.undraw()
 		del self.obj
 		
@@ -205,16 +193,16 @@ class Doors(object):
 	def show(self):
 		for i in range(4):
 			self.door[i].draw(win)
-			for j in range(255,-5,-5):
-				self.door[i].setFill(color_rgb(max(0,self.col[i][0]-j),max(0,self.col[i][1]-j),max(0,self.col[i][2]-j)))
-				sleep(0.01)
+			for col in FrameClock(100).steps(fade_ramp(self.col[i],5)):
+				self.door[i].setFill(col)
 		self.drawn = 1
 		
 	def hide(self):
-		for i in range(0,260,5):
-			for j in range(4):
-				self.door[j].setFill(color_rgb(max(0,self.col[j][0]-i),max(0,self.col[j][1]-i),max(0,self.col[j][2]-i)))
-			sleep(0.01)
+		ramps = [fade_ramp(self.col[j],5) for j in range(4)]
+		for i in FrameClock(100).steps(range(len(ramps[0])-1,-1,-1)):
+			with win.frame():
+				for j in range(4):
+					self.door[j].setFill(ramps[j][i])
 		for i in range(4):
 			self.door[i].undraw()
 		self.drawn = 0
@@ -236,17 +224,16 @@ class Curtain(object):
 		self.open()
 		
 	def open(self):
-		anchor = self.obj[0].getP2().getX()
-		for i in range(64):
-			self.obj[0].move(-5,0)
-			self.obj[1].move(5,0)
-			sleep(0.01)
+		left = self.obj[0].animate(dx=-320,duration=0.64)
+		right = self.obj[1].animate(dx=320,duration=0.64)
+		left.join()
+		right.join()
 			
 	def close(self):
-		for i in range(64):
-			self.obj[0].move(5,0)
-			self.obj[1].move(-5,0)
-			sleep(0.01)
+		left = self.obj[0].animate(dx=320,duration=0.64)
+		right = self.obj[1].animate(dx=-320,duration=0.64)
+		left.join()
+		right.join()
 			
 # Player class
 class Player(object):
@@ -284,36 +271,28 @@ class Boss(object):
 		
 	def appear(self):
 		self.obj.draw(win)
-		for i in range(255,-5,-5):
-			self.obj.setFill(color_rgb(max(0,self.col[0]-i),max(0,self.col[1]-i),max(0,self.col[2]-i)))
-			sleep(0.01)
+		for col in FrameClock(100).steps(fade_ramp(self.col,5)):
+			self.obj.setFill(col)
 		self.drawn = 1
 		
 	def disappear(self):
 		if self.hp > 0:
-			for i in range(0,260,5):
-				self.obj.setFill(color_rgb(max(0,self.col[0]-i),max(0,self.col[1]-i),max(0,self.col[2]-i)))
-				sleep(0.01)
+			for col in FrameClock(100).steps(reversed(fade_ramp(self.col,5))):
+				self.obj.setFill(col)
 		else:
-			for i in range(0,130,5):
-				self.obj.setFill(color_rgb(max(0,127-i),max(0,127-i),max(0,127-i)))
-				sleep(0.01)
+			for col in FrameClock(100).steps(reversed(fade_ramp([127,127,127],5,125))):
+				self.obj.setFill(col)
 		self.obj.undraw()
 		self.drawn = 0
 		
 	def flicker(self,times):
-		for i in range(times):
-			self.obj.setFill(color_rgb(0,0,0))
-			sleep(0.1)
-			self.obj.setFill(color_rgb(self.col[0],self.col[1],self.col[2]))
-			sleep(0.1)
+		cols = [color_rgb(0,0,0),color_rgb(self.col[0],self.col[1],self.col[2])]
+		for col in FrameClock(10).steps(cols*times):
+			self.obj.setFill(col)
 		
 	def flash(self):
-		for i in range(2):
-			self.obj.setFill(color_rgb(255,255,255))
-			sleep(0.1)
-			self.obj.setFill(color_rgb(0,0,0))
-			sleep(0.1)
+		for col in FrameClock(10).steps([color_rgb(255,255,255),color_rgb(0,0,0)]*2):
+			self.obj.setFill(col)
 		self.obj.setFill(color_rgb(127,127,127))
 		
 # TASKS ####################################################################################################
@@ -356,29 +335,29 @@ def bossroom(index,text,opt,door,curt,you):
 	bosses = [ 	{"name":"Akua Ahi",		"face": "火",	"r":255,"g":102,"b":51,	"hp":500,	"atk":20,	"def":-20,	"prs":-10,	"evs":0,	"lck":10,	"prt":0,
 					"bio":["\"Entry I:\"",
 							"\"Akua Ahi, the idol of fire...\"",
-							"\"They have immense power, however their\ndefences are lacking.\"",
-							"\"They also tend to be very reckless and\nmiss their targets.\""]},
+							"\"They have immense power, however their defences are lacking.\"",
+							"\"They also tend to be very reckless and miss their targets.\""]},
 				{"name":"Akua Lepo",	"face": "土",	"r":255,"g":204,"b":102,"hp":500,	"atk":-20,	"def":20,	"prs":0,	"evs":-10,	"lck":0,	"prt":10,
 					"bio":["\"Entry II:\"",
 							"\"Akua Lepo, the idol of earth...\"",
-							"\"Their defence is unbreakable, however they\nare very sluggish in attacking.\"",
-							"\"They are so placid and confident that\nthey will not even try to dodge attacks.\""]},
+							"\"Their defence is unbreakable, however they are very sluggish in attacking.\"",
+							"\"They are so placid and confident that they will not even try to dodge attacks.\""]},
 				{"name":"Akua Makani",	"face": "气",	"r":102,"g":204,"b":255,"hp":500,	"atk":0,	"def":-10,	"prs":10, 	"evs":-5,	"lck":20,	"prt":-5,
 					"bio":["\"Entry III:\"",
 							"\"Akua Makani, the idol of wind...\"",
-							"\"They rely solely on their luck, as they\ndo not have very much stamina.\"",
-							"\"They are the most anxious of the idols\nand prioritise having perfect accuracy.\""]},
+							"\"They rely solely on their luck, as they do not have very much stamina.\"",
+							"\"They are the most anxious of the idols and prioritise having perfect accuracy.\""]},
 				{"name":"Akua Wai",		"face": "水",	"r":51,	"g":102,"b":255,"hp":500,	"atk":-10,	"def":0,	"prs":-5,	"evs":10,	"lck":-5,	"prt":20,
 					"bio":["\"Entry IV:\"",
 							"\"Akua Wai, the idol of water...\"",
-							"\"They are both resilient and evasive, but they\ndo not attack very forcefully.\"",
-							"\"They are a trickster. Not only are they hard\nto hit, they can also take many hits.\""]},
+							"\"They are both resilient and evasive, but they do not attack very forcefully.\"",
+							"\"They are a trickster. Not only are they hard to hit, they can also take many hits.\""]},
 				{"name":"Akua Lani",	"face": "大天王","r":153,"g":102,"b":153,"hp":750,	"atk":5,	"def":5,	"prs":5,	"evs":5,	"lck":5,	"prt":5,
 					"bio":["\"Entry V:\"",
 							"\"Akua Lani, the supreme god of the idols...\"",
-							"\"They are very adept in all areas. Please\ntake extreme caution.\"",
-							"\"They have all of the other idols' skills,\nplus a whopping health pool.\"",
-							"\"They are so self-absorbed, they have three\ncharacters in their body rather than one.\""]}]
+							"\"They are very adept in all areas. Please take extreme caution.\"",
+							"\"They have all of the other idols' skills, plus a whopping health pool.\"",
+							"\"They are so self-absorbed, they have three characters in their body rather than one.\""]}]
 	sleep(0.5)
 	curt.open()
 	boss = Boss(bosses[index])
@@ -458,7 +437,7 @@ def lobby(text,opt,door,curt,you):
 	if len(door.greyed) == 4:
 		text.set("...")
 		text.set("Incredible.")
-		text.set("You defeated the four idols with minimal\neffort.")
+		text.set("You defeated the four idols with minimal effort.")
 		text.set("However... there is, in fact, one more.")
 		text.set("This idol is far stronger than the others.")
 		text.set("Prepare yourself, now...")
@@ -468,9 +447,9 @@ def lobby(text,opt,door,curt,you):
 	else:
 		if len(door.greyed) == 3:
 			text.set("How are you managing?")
-			text.set("Since you defeated three idols thus far, it\nwould only be fair to give you a small boost.")
+			text.set("Since you defeated three idols thus far, it would only be fair to give you a small boost.")
 			you.inventory.append("NECTAR")
-			text.set("This item is Nectar, the beverage of the gods.\nOne bottle of this sacred fluid will heal you\nentirely.")
+			text.set("This item is Nectar, the beverage of the gods. One bottle of this sacred fluid will heal you entirely.")
 			text.set("Use it wisely...")
 		if door.drawn == 0:
 			text.set("")
@@ -489,15 +468,15 @@ def lobby(text,opt,door,curt,you):
 
 # Information task
 def info(text,opt):
-	text.set("Four idols stand before you. You must do\nbattle with each of them in the order of your\nchoosing.")
-	text.set("Once you enter a room, you cannot exit it\nuntil either a winner is decided, or you\nforfeit.")
-	text.set("Upon defeating an idol, you will receive their\nblessing. Each blessing has a unique effect on\nyour competence.")
+	text.set("Four idols stand before you. You must do battle with each of them in the order of your choosing.")
+	text.set("Once you enter a room, you cannot exit it until either a winner is decided, or you forfeit.")
+	text.set("Upon defeating an idol, you will receive their blessing. Each blessing has a unique effect on your competence.")
 	text.set("However, If you lose to any of them, you fail.")
 	text.set("In battle, you have multiple options:")
-	text.set("\"FIGHT\" is your attack prompt. You will attack\nyour enemy and they will attack back.")
-	text.set("\"EXAMINE\" allows you to look up a brief entry\nabout your opponent's stats without losing a\nturn.")
-	text.set("\"INVENTORY\" will open your collection of\nitems. You start out with four medicines that\nheal 50 HP each. Drinking one uses a turn.")
-	text.set("\"FORFEIT\" lets you give up fighting and ends\nthe challenge. You will lose all progress by\ndoing so.")
+	text.set("\"FIGHT\" is your attack prompt. You will attack your enemy and they will attack back.")
+	text.set("\"EXAMINE\" allows you to look up a brief entry about your opponent's stats without losing a turn.")
+	text.set("\"INVENTORY\" will open your collection of items. You start out with four medicines that heal 50 HP each. Drinking one uses a turn.")
+	text.set("\"FORFEIT\" lets you give up fighting and ends the challenge. You will lose all progress by doing so.")
 	text.set("May fortune smile upon you.")
 
 # Intro task
@@ -516,9 +495,9 @@ def intro(text,opt,curt):
 			
 # Epilogue task
 def epilogue(text):
-	text.set("So, it appears that you have defeated\neven the god of the idols...")
-	text.set("I applaud you. You have survived a hellion\nof RNG that not many would tolerate.")
-	text.set("I thank you, as well. I hope that you\nfound this challenging and engaging.")
+	text.set("So, it appears that you have defeated even the god of the idols...")
+	text.set("I applaud you. You have survived a hellion of RNG that not many would tolerate.")
+	text.set("I thank you, as well. I hope that you found this challenging and engaging.")
 	text.set("Thank you for playing!")
 	text.set("")
 
@@ -32,7 +32,6 @@
 """
 
 from graphics import * 
-from time import sleep
 from random import randint, choice
 from math import ceil
 
@@ -40,33 +39,34 @@ from math import ceil
 	
 # Box class
 class Box(object):
-	def __init__(self, pt1, pt2):
+	def __init__(self, name, pt1, pt2):
 		self.obj = []
 		self.hidden = True
+		# The inner rectangles are black on the black fill of the outer one until they fade in,
+		# so the whole layer can be shown and hidden at once
+		self.layer = win.layer(name)
+		self.layer.hide()
 		for i in range(5):
 			self.obj.append(Rectangle(Point(pt1[0] + i * 2, pt1[1] + i * 2), Point(pt2[0] - i * 2, pt2[1] - i * 2)))
 			self.obj[i].setOutline(color_rgb(0, 0, 0))
-			self.obj[i].draw(win)
-			self.obj[i].move(0, -480)
+			self.layer.add(self.obj[i])
 		self.obj[0].setFill(color_rgb(0, 0, 0))
 		
 	def show(self):
 		if self.hidden:
+			self.layer.show()
 			for i in range(len(self.obj)):
-				self.obj[i].move(0, 480)
-				for j in range(0, 255 + 51, 51):
-					self.obj[i].setOutline(color_rgb(max(0, j - i * 64), max(0, j - i * 64), max(0, j - i * 64)))
-					sleep(1 / 60)
+				for col in FrameClock(60).steps(fade_ramp([255 - i * 64] * 3)):
+					self.obj[i].setOutline(col)
 			self.hidden = False
 		else: pass
 			
 	def hide(self):
 		if not self.hidden:
 			for i in range(len(self.obj) - 1, - 1, - 1):
-				for j in range(255, - 51, - 51):
-					self.obj[i].setOutline(color_rgb(max(0, j - i * 64), max(0, j - i * 64), max(0, j - i * 64)))
-					sleep(1 / 60)
-				self.obj[i].move(0, -480)
+				for col in FrameClock(60).steps(reversed(fade_ramp([255 - i * 64] * 3))):
+					self.obj[i].setOutline(col)
+			self.layer.hide()
 			self.hidden = True
 		else: pass
 			
@@ -78,32 +78,25 @@ class Backdrop(object):
 		self.hidden = True
 		for i in range(31):
 			self.obj.append(Line(Point((i + 1) * 20, 0), Point(((i + 1) * 20) * 2 - 320, 360)))
-			self.obj[i].setOutline(color_rgb(0, 0, 0))
-			self.obj[i].setWidth(2)
-			self.obj[i].draw(win)
-			
 		for i in range(15):
 			self.obj.append(Line(Point(0, (i + 1) * (10 + i)), Point(640, (i + 1) * (10 + i))))
-			self.obj[i + 31].setOutline(color_rgb(0, 0, 0))
-			self.obj[i + 31].setWidth(2)
-			self.obj[i + 31].draw(win)
+		self.group = Group(*self.obj)
+		self.group.setOutline(color_rgb(0, 0, 0))
+		self.group.setWidth(2)
+		self.group.draw(win)
 			
 	def show(self, col=[255, 255, 255]):
 		self.c = col
 		if self.hidden:
-			for i in range(255, - 51, - 51):
-				for j in range(len(self.obj)):
-					self.obj[j].setOutline(color_rgb(max(0, self.c[0] - i), max(0, self.c[1] - i), max(0, self.c[2] - i)))
-				sleep(1 / 60)
+			for col in FrameClock(60).steps(fade_ramp(self.c)):
+				self.group.setOutline(col)
 			self.hidden = False
 		else: pass
 			
 	def hide(self):
 		if not self.hidden:
-			for i in range(0, 255 + 51, 51):
-				for j in range(len(self.obj)):
-					self.obj[j].setOutline(color_rgb(max(0, self.c[0] - i), max(0, self.c[1] - i), max(0, self.c[2] - i)))
-				sleep(1 / 60)
+			for col in FrameClock(60).steps(reversed(fade_ramp(self.c))):
+				self.group.setOutline(col)
 			self.hidden = True
 		else: pass
 		
@@ -116,22 +109,23 @@ class EndBG(object):
 			self.obj[i].setOutline(color_rgb(0, 0, 0))
 			self.obj[i].setWidth(8)
 			self.obj[i].draw(win)
+		self.ramps = [fade_ramp([j * 4, j * 4 - 100, 100 - j * 4], 17) for j in range(60)]
 			
 	def show(self):
 		if self.hidden:
-			for i in range(255, -17, -17):
-				for j in range(len(self.obj)):
-					self.obj[j].setOutline(color_rgb(max(0, 0 - i + j * 4), max(0, - 100 - i + j * 4), max(0, 100 - i - j * 4)))
-				sleep(1 / 60)
+			for i in FrameClock(60).steps(range(len(self.ramps[0]))):
+				with win.frame():
+					for j in range(len(self.obj)):
+						self.obj[j].setOutline(self.ramps[j][i])
 			self.hidden = False
 		else: pass
 			
 	def hide(self):
 		if not self.hidden:
-			for i in range(0, 255 + 17, 17):
-				for j in range(len(self.obj)):
-					self.obj[j].setOutline(color_rgb(max(0, 0 - i + j * 4), max(0, - 100 - i + j * 4), max(0, 100 - i - j * 4)))
-				sleep(1 / 60)
+			for i in FrameClock(60).steps(range(len(self.ramps[0]) - 1, -1, -1)):
+				with win.frame():
+					for j in range(len(self.obj)):
+						self.obj[j].setOutline(self.ramps[j][i])
 			self.hidden = True
 		else: pass
 			
@@ -142,30 +136,30 @@ class Terrain(object):
 		self.obj.append(Oval(Point(0, 320), Point(359, 439)))
 		self.obj.append(Oval(Point(320, 120), Point(639, 239)))
 		self.hidden = True
+		# The ovals are filled, so they still come and go one at a time
+		self.layer = win.layer("floor")
 		for i in range(2):
 			self.obj[i].setOutline(color_rgb(0, 0, 0))
 			self.obj[i].setFill(color_rgb(0, 0, 0))
 			self.obj[i].setWidth(5)
-			self.obj[i].draw(win)
-			self.obj[i].move(0, - 480)
+			self.obj[i].hide()
+			self.layer.add(self.obj[i])
 		
 	def show(self):
 		if self.hidden:
 			for i in range(len(self.obj)):
-				self.obj[i].move(0, 480)
-				for j in range(0, 255 + 17, 17):
-					self.obj[i].setOutline(color_rgb(max(0, j), max(0, j), max(0, j)))
-					sleep(1 / 60)
+				self.obj[i].show()
+				for col in FrameClock(60).steps(fade_ramp([255, 255, 255], 17)):
+					self.obj[i].setOutline(col)
 			self.hidden = False
 		else: pass
 			
 	def hide(self):
 		if not self.hidden:
 			for i in range(len(self.obj) - 1, - 1, - 1):
-				for j in range(255, -17, -17):
-					self.obj[i].setOutline(color_rgb(max(0, j), max(0, j), max(0, j)))
-					sleep(1 / 60)
-				self.obj[i].move(0, - 480)
+				for col in FrameClock(60).steps(reversed(fade_ramp([255, 255, 255], 17))):
+					self.obj[i].setOutline(col)
+				self.obj[i].hide()
 			self.hidden = True
 		else: pass
 		
@@ -181,26 +175,13 @@ class Message(object):
 		self.obj.setSize(size)
 		
 	def set(self, str, r=255, g=255, b=255):
-		spl = str.split()
-		cnt = 0
-		
-		# Highly unorthodox way of auto-generating line breaks ahoy.
-		for i in range(len(spl)):
-			cnt += len(spl[i])	
-			if cnt > 44:
-				spl[i - 1] = spl[i - 1] + "\n"
-				cnt = len(spl[i - 1])			
-			else:
-				spl[i - 1] = spl[i - 1] + " "
-				cnt += 1	
-		str = "".join(spl)
+		str = self.obj.wrap(str, 600)
 		self.obj.setFill(color_rgb(r, g, b))
 		self.obj.setText("")
 		sleep(1 / 30)
 		if len(str) > 0:
-			for i in range(len(str) + 1):
+			for i in FrameClock(60).steps(range(len(str) + 1)):
 				self.obj.setText("{}".format(str[:i]))
-				sleep(1 / 60)	
 			sleep(1)
 			
 # Pre-game watermark class
@@ -213,14 +194,12 @@ class Watermark(object):
 		
 	def show(self):
 		self.obj.draw(win)
-		for i in range(255, -17, -17):
-			self.obj.setFill(color_rgb(i, i, i))
-			sleep(1 / 60)
+		for col in FrameClock(60).steps(reversed(fade_ramp([255, 255, 255], 17))):
+			self.obj.setFill(col)
 		
 	def hide(self):
-		for i in range(0, 255 + 17, 17):
-			self.obj.setFill(color_rgb(i, i, i))
-			sleep(1 / 60)
+		for col in FrameClock(60).steps(fade_ramp([255, 255, 255], 17)):
+			self.obj.setFill(col)
 		self.obj.undraw()
 		
 # Options task
@@ -230,13 +209,15 @@ class Option(object):
 		self.box = []
 		self.min = []
 		self.max = []
+		self.regions = []
+		self.pool = ItemPool(win)
 		
 	def set(self, opts):
 		#Before selection
 		start = 320 - (len(opts) - 1) * 50
 		for i in range(len(opts)):
 			self.txt.append(Text(Point(start + i * 100, 440), opts[i]))
-			self.txt[i].draw(win)
+			self.pool.draw(self.txt[i])
 			self.txt[i].setSize(5)
 			self.txt[i].setFill(color_rgb(255, 255, 255))
 			self.txt[i].setFace("courier")
@@ -244,48 +225,44 @@ class Option(object):
 			self.min.append(start - 50 + i * 100)
 			self.max.append(start + 50 + i * 100)
 			self.box.append(Polygon(Point(self.min[i] + 10, 420), Point(self.max[i] - 10, 420), Point(self.max[i] - 5, 440), Point(self.max[i] - 10, 460), Point(self.min[i] + 10, 460), Point(self.min[i] + 5, 440)))
-			self.box[i].draw(win)
-		for j in range(6, 11):
-			for i in range(len(opts)):
-				self.txt[i].setSize(j)
-			sleep(1 / 60)
-		for j in range(0, 255 + 51, 51):
-			for i in range(len(opts)):
-				self.box[i].setOutline(color_rgb(j, j, j))
-			sleep(1 / 60)
+			self.pool.draw(self.box[i])
+			self.regions.append(win.addRegion(Rectangle(Point(self.min[i], 420), Point(self.max[i], 460)), value=i))
+		for j in FrameClock(60).steps(range(6, 11)):
+			with win.frame():
+				for i in range(len(opts)):
+					self.txt[i].setSize(j)
+		for col in FrameClock(60).steps(fade_ramp([255, 255, 255])):
+			with win.frame():
+				for i in range(len(opts)):
+					self.box[i].setOutline(col)
 		res = self.select()
+		for region in self.regions:
+			win.removeRegion(region)
 		
 		#After selection
 		restxt, resbox = self.txt.pop(res), self.box.pop(res)
-		for i in range(255, -51, -51):
-			for j in range(len(opts) - 1):
-				self.txt[j].setFill(color_rgb(i, i, i))
-				self.box[j].setOutline(color_rgb(i, i, i))
-			resbox.setOutline(color_rgb(i, i, i))
-			sleep(1 / 60)
-		for i in range(len(opts) - 1):
-			self.txt[i].undraw()
-			self.box[i].undraw()
-		resbox.undraw()
-		for i in range(10, 19):
+		for col in FrameClock(60).steps(reversed(fade_ramp([255, 255, 255]))):
+			with win.frame():
+				for j in range(len(opts) - 1):
+					self.txt[j].setFill(col)
+					self.box[j].setOutline(col)
+				resbox.setOutline(col)
+		with win.frame():
+			for i in range(len(opts) - 1):
+				self.pool.undraw(self.txt[i])
+				self.pool.undraw(self.box[i])
+			self.pool.undraw(resbox)
+		for i in FrameClock(60).steps(range(10, 19)):
 			restxt.setSize(i)
-			sleep(1 / 60)
 		sleep(1 / 6)
-		for i in range(255, -51, -51):
-			restxt.setFill(color_rgb(i, i, i))
-			sleep(1 / 60)
-		restxt.undraw()
-		del(self.txt[:], self.box[:], self.max[:], self.min[:], restxt, resbox)
+		for col in FrameClock(60).steps(reversed(fade_ramp([255, 255, 255]))):
+			restxt.setFill(col)
+		self.pool.undraw(restxt)
+		del(self.txt[:], self.box[:], self.max[:], self.min[:], self.regions[:], restxt, resbox)
 		return res
 		
 	def select(self):
-		pick = win.getMouse()
-		if pick.getY() >= 420 and pick.getY() < 460 and pick.getX() >= self.min[0] and pick.getX() < self.max[ - 1]:
-			for i in range(len(self.txt)):
-				if pick.getX() >= self.min[i] and pick.getX() < self.max[i]:
-					return i
-		else:
-			return self.select()
+		return win.getRegion().value
 			
 # Health/Mana/Gold HUD class
 class Stat(object):
@@ -306,9 +283,8 @@ class Stat(object):
 	def set(self, value):
 		if self.drawn == 0:
 			self.obj.draw(win)
-			for i in range(6, 13):
-				self.obj.setSize(i)
-				sleep(1 / 60)
+			self.obj.setSize(6)
+			self.obj.animate(size=12, duration=7 / 60).join()
 			self.drawn = 1
 		self.value = self.iterate(self.value, value)
 		
@@ -321,40 +297,28 @@ class Stat(object):
 		elif new < 0:
 			new = 0
 		if new != old:
-			for i in range(14, 17):
-				self.obj.setSize(i)
-				sleep(1 / 60)
+			self.obj.animate(size=16, duration=3 / 60).join()
 			if new > old:
-				for i in range(old, new + 1):
+				for i in FrameClock(600).steps(range(old, new + 1)):
 					if remax:
 						self.obj.setText(self.string.format(self.name, self.value, i))
 					else:
 						self.obj.setText(self.string.format(self.name, i, self.max))
-					if (old + i) % 10 == 0:
-						sleep(1 / 60)
-						pass
 			elif new < old:
-				for i in range(old, new - 1, -1):
+				for i in FrameClock(600).steps(range(old, new - 1, -1)):
 					if remax:
 						self.obj.setText(self.string.format(self.name, self.value, i))
 					else:
 						self.obj.setText(self.string.format(self.name, i, self.max))
-					if (old + i) % 10 == 0:
-						sleep(1 / 60)
-						pass
 			sleep(1 / 6)
-			for i in range(16, 11, -1):
-				self.obj.setSize(i)
-				sleep(1 / 60)
+			self.obj.animate(size=12, duration=5 / 60).join()
 		elif new == old:
 			self.obj.setText(self.string.format(self.name, new, self.max))
 		return new
 		
 	def fade(self):
-		if self.obj:
-			for i in range(255, -51, -51):
-				self.obj.setFill(color_rgb(i, i, i))
-				sleep(1 / 60)
+		if self.drawn:
+			self.obj.animate(fill=color_rgb(0, 0, 0), duration=6 / 60).join()
 			self.obj.undraw()
 			del self.obj
 
@@ -364,12 +328,18 @@ class Doors(object):
 		self.door = []
 		self.won = []
 		self.col = []
+		self.ramps = []
+		# Every door is drawn once, hidden, and only moved when its place in the row changes
+		self.layer = win.layer("doors")
+		self.layer.hide()
 		for i in range(8):
 			self.col.append(bosses[i]["col"])
+			self.ramps.append(fade_ramp(self.col[i], 17))
 			self.door.append(Text(Point(320, 200), "۩"))
 			self.door[i].setFace("courier")
 			self.door[i].setSize(64)
 			self.door[i].setFill(color_rgb(0, 0, 0))
+			self.layer.add(self.door[i])
 		self.drawn = []
 		self.options = []
 		
@@ -377,22 +347,20 @@ class Doors(object):
 		self.determine()
 		inds = self.options
 		for i in range(len(inds)):
-			self.door[inds[i]].move(120 * i - 60 * (len(inds) - 1), 0)
-			self.door[inds[i]].draw(win)
-			for j in range(255, -17, -17):
-				self.door[inds[i]].setFill(color_rgb(max(0, self.col[inds[i]][0] - j), max(0, self.col[inds[i]][1] - j), max(0, self.col[inds[i]][2] - j)))
-				sleep(1 / 60)
+			dx = 320 + 120 * i - 60 * (len(inds) - 1) - self.door[inds[i]].getAnchor().getX()
+			if dx:
+				self.door[inds[i]].move(dx, 0)
+			self.door[inds[i]].show()
+			for col in FrameClock(60).steps(self.ramps[inds[i]]):
+				self.door[inds[i]].setFill(col)
 		self.drawn = inds
 		
 	def hide(self):
-		inds = self.options
-		for i in range(0, 255 + 17, 17):
-			for j in self.drawn:
-				self.door[j].setFill(color_rgb(max(0, self.col[j][0] - i), max(0, self.col[j][1] - i), max(0, self.col[j][2] - i)))
-			sleep(1 / 60)
-		for i in range(len(inds)):
-			self.door[inds[i]].move((120 * i - 60 * (len(inds) - 1)) * - 1, 0)
-			self.door[inds[i]].undraw()
+		for i in FrameClock(60).steps(range(len(self.ramps[0]) - 1, -1, -1)):
+			with win.frame():
+				for j in self.drawn:
+					self.door[j].setFill(self.ramps[j][i])
+		self.layer.hide()
 		self.drawn = []
 		
 	def win(self, index):
@@ -431,17 +399,16 @@ class Curtain(object):
 			self.obj[i].draw(win)
 		
 	def open(self):
-		anchor = self.obj[0].getP2().getX()
-		for i in range(32):
-			self.obj[0].move(-10, 0)
-			self.obj[1].move(10, 0)
-			sleep(1 / 60)
+		left = self.obj[0].animate(dx=-320, duration=32 / 60)
+		right = self.obj[1].animate(dx=320, duration=32 / 60)
+		left.join()
+		right.join()
 			
 	def close(self):
-		for i in range(32):
-			self.obj[0].move(10, 0)
-			self.obj[1].move(-10, 0)
-			sleep(1 / 60)
+		left = self.obj[0].animate(dx=320, duration=32 / 60)
+		right = self.obj[1].animate(dx=-320, duration=32 / 60)
+		left.join()
+		right.join()
 			
 # Player class
 class Player(object):
@@ -483,34 +450,25 @@ class Boss(object):
 		self.obj.setSize(96 if dict["name"] == "Akua Hala" else 64)
 		self.drawn = 0
 	def appear(self):
+		self.obj.setFill(color_rgb(0, 0, 0))
 		self.obj.draw(win)
-		for i in range(255, -5, -5):
-			self.obj.setFill(color_rgb(max(0, self.col[0] - i), max(0, self.col[1] - i), max(0, self.col[2] - i)))
-			sleep(1 / 120)
+		self.obj.animate(fill=color_rgb(*self.col), duration=52 / 120).join()
 		self.drawn = 1	
 	def disappear(self):
-		if self.hp.value > 0:
-			for i in range(0, 260, 5):
-				self.obj.setFill(color_rgb(max(0, self.col[0] - i), max(0, self.col[1] - i), max(0, self.col[2] - i)))
-				sleep(1 / 120)
+		if self.hp.value <= 0:
+			self.obj.setFill(color_rgb(127, 127, 127))
+			self.obj.animate(fill=color_rgb(0, 0, 0), duration=26 / 120).join()
 		else:
-			for i in range(0, 130, 5):
-				self.obj.setFill(color_rgb(max(0, 127 - i), max(0, 127 - i), max(0, 127 - i)))
-				sleep(1 / 120)
+			self.obj.animate(fill=color_rgb(0, 0, 0), duration=52 / 120).join()
 		self.obj.undraw()
 		self.drawn = 0
 	def flicker(self, times, col=[0, 0, 0]):
-		for i in range(times):
-			self.obj.setFill(color_rgb(col[0], col[1], col[2]))
-			sleep(1/12)
-			self.obj.setFill(color_rgb(self.col[0], self.col[1], self.col[2]))
-			sleep(1/12)
+		cols = [color_rgb(col[0], col[1], col[2]), color_rgb(self.col[0], self.col[1], self.col[2])]
+		for c in FrameClock(12).steps(cols * times):
+			self.obj.setFill(c)
 	def flash(self):
-		for i in range(2):
-			self.obj.setFill(color_rgb(255, 255, 255))
-			sleep(1/12)
-			self.obj.setFill(color_rgb(0, 0, 0))
-			sleep(1/12)
+		for col in FrameClock(12).steps([color_rgb(255, 255, 255), color_rgb(0, 0, 0)] * 2):
+			self.obj.setFill(col)
 		self.obj.setFill(color_rgb(127, 127, 127))
 		
 # TASKS ####################################################################################################
@@ -931,9 +889,9 @@ win = GraphWin("RPGIII", 640, 480)
 ebg = EndBG()
 bg = Backdrop()
 floor = Terrain()
-pbox = Box([0, 280], [180, 360])
-bbox = Box([520, 0], [639, 40])
-box = Box([0, 360], [639, 479])
+pbox = Box("pbox", [0, 280], [180, 360])
+bbox = Box("bbox", [520, 0], [639, 40])
+box = Box("box", [0, 360], [639, 479])
 text = Message(384, 16)
 opt = Option()
 door = Doors()
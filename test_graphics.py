@@ -0,0 +1,94 @@
+"""Checks of graphics.py on the raster backend, which needs no display.
+
+Run with: python -m unittest test_graphics (or pytest)"""
+
+import unittest
+
+import graphics
+from graphics import GraphWin, Image, ItemPool, Point, Rectangle, Text, \
+     use_backend
+
+
+class RasterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backend = graphics._backend
+        use_backend("raster")
+        self.win = GraphWin("test", 200, 60)
+
+    def tearDown(self):
+        self.win.close()
+        use_backend(self.backend)
+
+    def columns(self, frame):
+        # The first and last columns holding pixels that are not the
+        #   background color
+        background = frame.getPixel(0, 0)
+        xs = [x for x in range(frame.width) for y in range(frame.height)
+              if frame.getPixel(x, y) != background]
+        return min(xs), max(xs)
+
+    def textColumns(self, anchor):
+        # Text objects are always centered, so create the item directly
+        self.win.create_text(100, 30, text="HELLO", anchor=anchor)
+        return self.columns(self.win.snapshot())
+
+    def test_centered_text(self):
+        Text(Point(100, 30), "HELLO").draw(self.win)
+        left, right = self.columns(self.win.snapshot())
+        self.assertLess(left, 100)
+        self.assertGreater(right, 100)
+        self.assertLessEqual(abs((100 - left) - (right + 1 - 100)), 1)
+
+    def test_anchored_text(self):
+        left, right = self.textColumns("w")
+        self.assertGreaterEqual(left, 100)
+        self.assertLess(left, 103)
+        self.tearDown()
+        self.setUp()
+        left, right = self.textColumns("e")
+        self.assertLessEqual(right, 100)
+        self.assertGreater(right, 96)
+
+    def test_centered_image(self):
+        image = Image(Point(5, 5), 2, 2)
+        for x in range(2):
+            for y in range(2):
+                image.setPixel(x, y, "red")
+        image.draw(self.win)
+        frame = self.win.snapshot()
+        self.assertEqual(self.columns(frame), (4, 5))
+        self.assertEqual(frame.getPixel(4, 4), [255, 0, 0])
+
+    def test_color_names(self):
+        for color, rgb in (("navy", [0, 0, 128]),
+                           ("light blue", [173, 216, 230]),
+                           ("DarkSlateGray4", [82, 139, 139]),
+                           ("gray50", [127, 127, 127]),
+                           ("green", [0, 128, 0])):
+            rect = Rectangle(Point(0, 0), Point(199, 59))
+            rect.setFill(color)
+            rect.draw(self.win)
+            self.assertEqual(self.win.snapshot().getPixel(100, 30), rgb)
+            rect.undraw()
+
+    def test_plot_many(self):
+        self.win.plot_many(((x, 10) for x in range(3)), ["red"] * 3)
+        frame = self.win.snapshot()
+        self.assertEqual(frame.getPixel(2, 10), [255, 0, 0])
+        with self.assertRaises(graphics.GraphicsError):
+            self.win.plot_many([(0, 0), (1, 0)], ["red"])
+
+    def test_pool_resets_options(self):
+        pool = ItemPool(self.win)
+        text = pool.draw(Text(Point(100, 30), "HELLO"))
+        id = text.id
+        self.win.itemconfig(id, anchor="nw")
+        pool.undraw(text)
+        text = pool.draw(Text(Point(100, 30), "HELLO"))
+        self.assertEqual(text.id, id)
+        self.assertNotIn("anchor", self.win.scene[id]["options"])
+
+
+if __name__ == "__main__":
+    unittest.main()